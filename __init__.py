@@ -37,7 +37,8 @@ def load_plugins() -> List[Type[BaseSource]]:
     """
     sources_path = Path(__file__).resolve().parent / "sources"
     plugins: List[Type[BaseSource]] = []
-    for module_file in sources_path.iterdir():
+    # Sorted so sources (and thus deduplication) run in the same order everywhere
+    for module_file in sorted(sources_path.iterdir()):
         if module_file.name.startswith("__") or not module_file.suffix == ".py":
             continue
         module_name = f"{__name__}.sources.{module_file.stem}"
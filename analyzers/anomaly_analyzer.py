@@ -0,0 +1,299 @@
+"""
+Analyzer that detects anomalies in indicator volume over time.
+
+Each collection run contributes one observation per series: the number
+of indicators seen for a ``(source, type)`` pair.  Volumes are counted
+before deduplication when the analyzer is registered as an observer of
+the collector (:meth:`AnomalyAnalyzer.observe`); otherwise the items
+reaching :meth:`AnomalyAnalyzer.analyze` are counted, and an indicator
+delivered by several sources only counts for the first of them.  For every series the
+analyzer keeps an exponentially weighted moving average and variance
+plus a P² quantile sketch (Jain & Chlamtac, 1985), which estimates an
+upper quantile of historical volumes from five markers.  State is
+therefore constant per series, and each item costs one dictionary
+lookup and an increment.
+
+Two kinds of anomaly are reported:
+
+* ``spike`` – the volume of a series exceeds both the EWMA band and the
+  historical upper quantile (e.g. a sudden jump in Shodan‑exposed
+  ports).  Items are flagged as soon as their series crosses the
+  threshold, so spikes are visible in the same run.
+* ``silence`` – a series with a meaningful historical volume produced
+  no indicators at all, typically a feed that stopped delivering.
+  Silence can only be known once the run is complete and is reported
+  by :meth:`AnomalyAnalyzer.close_run`.
+
+State is persisted as JSON between runs (``ANOMALY_STATE`` or
+``REPORTS_DIR/store/anomaly_state.json``) so history is never
+recomputed.
+"""
+
+import json
+import math
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from .. import metrics
+from .base_analyzer import BaseAnalyzer
+
+
+SeriesKey = Tuple[str, ...]
+
+
+class P2Quantile:
+    """Streaming estimate of a single quantile in constant memory.
+
+    Parameters
+    ----------
+    q: float
+        Quantile to track, between 0 and 1.
+    """
+
+    def __init__(self, q: float = 0.95):
+        self.q = q
+        self.heights: List[float] = []
+        self.positions = [1.0, 2.0, 3.0, 4.0, 5.0]
+        self.desired = [1.0, 1 + 2 * q, 1 + 4 * q, 3 + 2 * q, 5.0]
+        self.increments = [0.0, q / 2, q, (1 + q) / 2, 1.0]
+
+    def add(self, x: float) -> None:
+        h = self.heights
+        if len(h) < 5:
+            h.append(x)
+            h.sort()
+            return
+        if x < h[0]:
+            h[0] = x
+            k = 0
+        elif x >= h[4]:
+            h[4] = x
+            k = 3
+        else:
+            k = next(i for i in range(4) if h[i] <= x < h[i + 1])
+        n = self.positions
+        for i in range(k + 1, 5):
+            n[i] += 1
+        for i in range(5):
+            self.desired[i] += self.increments[i]
+        for i in (1, 2, 3):
+            d = self.desired[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                step = 1 if d > 0 else -1
+                candidate = self._parabolic(i, step)
+                if not h[i - 1] < candidate < h[i + 1]:
+                    candidate = h[i] + step * (h[i + step] - h[i]) / (n[i + step] - n[i])
+                h[i] = candidate
+                n[i] += step
+
+    def _parabolic(self, i: int, d: int) -> float:
+        h, n = self.heights, self.positions
+        return h[i] + d / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + d) * (h[i + 1] - h[i]) / (n[i + 1] - n[i])
+            + (n[i + 1] - n[i] - d) * (h[i] - h[i - 1]) / (n[i] - n[i - 1])
+        )
+
+    def value(self) -> Optional[float]:
+        """Return the current estimate, or ``None`` before any observation."""
+        h = self.heights
+        if not h:
+            return None
+        if len(h) < 5:
+            return h[min(len(h) - 1, int(round(self.q * (len(h) - 1))))]
+        return h[2]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"q": self.q, "heights": self.heights, "positions": self.positions, "desired": self.desired}
+
+    @classmethod
+    def from_dict(cls, doc: Mapping[str, Any]) -> "P2Quantile":
+        sketch = cls(doc.get("q", 0.95))
+        sketch.heights = list(doc.get("heights", []))
+        sketch.positions = list(doc.get("positions", sketch.positions))
+        sketch.desired = list(doc.get("desired", sketch.desired))
+        return sketch
+
+
+class SeriesStats:
+    """EWMA, EW variance and quantile sketch of one volume series."""
+
+    __slots__ = ("mean", "var", "runs", "last_seen", "sketch")
+
+    def __init__(self, quantile: float = 0.95):
+        self.mean = 0.0
+        self.var = 0.0
+        self.runs = 0
+        self.last_seen: Optional[str] = None
+        self.sketch = P2Quantile(quantile)
+
+    def update(self, value: float, alpha: float) -> None:
+        if self.runs == 0:
+            self.mean = value
+        else:
+            # Incremental EW mean/variance (West 1979)
+            diff = value - self.mean
+            incr = alpha * diff
+            self.mean += incr
+            self.var = (1 - alpha) * (self.var + diff * incr)
+        self.sketch.add(value)
+        self.runs += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"mean": self.mean, "var": self.var, "runs": self.runs, "last_seen": self.last_seen,
+                "sketch": self.sketch.to_dict()}
+
+    @classmethod
+    def from_dict(cls, doc: Mapping[str, Any]) -> "SeriesStats":
+        stats = cls()
+        stats.mean = doc.get("mean", 0.0)
+        stats.var = doc.get("var", 0.0)
+        stats.runs = doc.get("runs", 0)
+        stats.last_seen = doc.get("last_seen")
+        stats.sketch = P2Quantile.from_dict(doc.get("sketch", {}))
+        return stats
+
+
+class AnomalyAnalyzer(BaseAnalyzer):
+    """Flag volume spikes and silent feeds per series.
+
+    Parameters
+    ----------
+    state_path: Path, optional
+        JSON file holding the persisted series state.  Defaults to
+        ``ANOMALY_STATE``; when neither is set the state lives in memory.
+    series_fields: Sequence[str]
+        Item fields that define a series.
+    alpha: float
+        EWMA smoothing factor.
+    threshold: float
+        Number of EW standard deviations above the mean that counts as a spike.
+    quantile: float
+        Historical quantile a spike must also exceed.
+    warmup_runs: int
+        Runs observed before a series can be flagged.
+    min_volume: float
+        Minimum average volume for a series going silent to be reported.
+    """
+
+    def __init__(
+        self,
+        state_path: Optional[Path] = None,
+        series_fields: Sequence[str] = ("source", "type"),
+        alpha: float = 0.3,
+        threshold: float = 3.0,
+        quantile: float = 0.95,
+        warmup_runs: int = 5,
+        min_volume: float = 5.0,
+    ):
+        state_path = state_path or os.environ.get("ANOMALY_STATE")
+        self.state_path = Path(state_path) if state_path else None
+        self.series_fields = tuple(series_fields)
+        self.alpha = alpha
+        self.threshold = threshold
+        self.quantile = quantile
+        self.warmup_runs = warmup_runs
+        self.min_volume = min_volume
+        self.series: Dict[SeriesKey, SeriesStats] = {}
+        self._counts: Dict[SeriesKey, int] = {}
+        self._limits: Dict[SeriesKey, Optional[float]] = {}
+        # Set once observe() has counted an item in the current run
+        self._observing = False
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self) -> None:
+        """Restore series state from :attr:`state_path` if it exists."""
+        if self.state_path is None or not self.state_path.exists():
+            return
+        try:
+            doc = json.loads(self.state_path.read_text())
+        except Exception:
+            # A corrupt state file only costs the history, not the run
+            return
+        self.series = {tuple(entry["key"]): SeriesStats.from_dict(entry) for entry in doc.get("series", [])}
+
+    def save(self) -> None:
+        """Persist series state to :attr:`state_path` (no‑op without one)."""
+        if self.state_path is None:
+            return
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        doc = {"series": [dict(stats.to_dict(), key=list(key)) for key, stats in self.series.items()]}
+        tmp = self.state_path.with_suffix(self.state_path.suffix + ".tmp")
+        tmp.write_text(json.dumps(doc))
+        os.replace(tmp, self.state_path)
+
+    def spike_limit(self, key: SeriesKey) -> Optional[float]:
+        """Return the volume above which ``key`` is a spike, or ``None`` while warming up."""
+        stats = self.series.get(key)
+        if stats is None or stats.runs < self.warmup_runs:
+            return None
+        band = stats.mean + self.threshold * math.sqrt(stats.var)
+        upper = stats.sketch.value() or 0.0
+        # Never flag a handful of items on an almost idle series
+        return max(band, upper, stats.mean + self.min_volume)
+
+    def _key(self, item: Mapping[str, Any]) -> SeriesKey:
+        return tuple(str(item.get(f, "unknown")) for f in self.series_fields)
+
+    def observe(self, item: Mapping[str, Any]) -> None:
+        """Count a fetched item, duplicates included (an :class:`IOCCollector` observer)."""
+        self._observing = True
+        key = self._key(item)
+        self._counts[key] = self._counts.get(key, 0) + 1
+
+    def analyze(self, data: Iterable[Mapping[str, Any]]) -> Iterable[Mapping[str, Any]]:
+        fields = self.series_fields
+        counts, limits = self._counts, self._limits
+        for item in data:
+            key = self._key(item)
+            if self._observing:
+                # Already counted by observe(), including later duplicates
+                count = counts.get(key, 0)
+            else:
+                count = counts.get(key, 0) + 1
+                counts[key] = count
+            if key in limits:
+                limit = limits[key]
+            else:
+                # Thresholds are frozen at the start of a run
+                limit = limits[key] = self.spike_limit(key)
+            item = dict(item)
+            if limit is not None and count > limit:
+                item["anomaly"] = {"kind": "spike", "series": dict(zip(fields, key)), "expected": round(limit, 2)}
+            else:
+                item["anomaly"] = None
+            yield item
+
+    def close_run(self, now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """Fold this run's volumes into the history and return detected anomalies.
+
+        Every known series receives an observation (zero if it produced
+        nothing), so feeds that go silent are caught.  Call once per
+        collection run, then :meth:`save`.
+        """
+        seen_at = (now or datetime.utcnow()).isoformat() + "Z"
+        anomalies: List[Dict[str, Any]] = []
+        with self._lock:
+            counts, self._counts, self._limits = self._counts, {}, {}
+            self._observing = False
+            for key in set(self.series) | set(counts):
+                observed = counts.get(key, 0)
+                stats = self.series.get(key)
+                if stats is None:
+                    stats = self.series[key] = SeriesStats(self.quantile)
+                series = dict(zip(self.series_fields, key))
+                limit = self.spike_limit(key)
+                if limit is not None and observed > limit:
+                    anomalies.append({"kind": "spike", "series": series, "observed": observed, "expected": round(limit, 2)})
+                elif observed == 0 and stats.runs >= self.warmup_runs and stats.mean >= self.min_volume:
+                    anomalies.append({"kind": "silence", "series": series, "observed": 0,
+                                      "expected": round(stats.mean, 2), "last_seen": stats.last_seen})
+                stats.update(observed, self.alpha)
+                if observed:
+                    stats.last_seen = seen_at
+        for anomaly in anomalies:
+            metrics.ANOMALIES.inc(kind=anomaly["kind"])
+        return anomalies
@@ -0,0 +1,344 @@
+"""
+Analyzer that clusters correlated indicators into campaigns.
+
+Indicators and the attributes they share are treated as nodes of a
+graph.  Each indicator is a node keyed on ``(type, value)``, so the same
+indicator reported in different events links those events.  Grouping
+attributes such as the source event, pulse or scan identifier are nodes
+too, and an indicator is connected to every group it appears in.  The
+connected components of this graph are the campaigns.
+
+Components are maintained with a union‑find structure backed by flat
+``array`` buffers (path halving, union by size), so adding an edge is
+effectively constant time and millions of edges fit in a few dozen
+bytes per node.  Clustering is incremental: new collections extend the
+existing forest instead of rebuilding it, and the structure can be
+saved to and restored from disk between runs.  Node keys are stored
+length‑prefixed, so any string (newlines included) round‑trips.
+
+Every item is annotated with ``campaign_id`` (stable for the lifetime
+of the state: when two campaigns merge, the older ID wins) and
+``campaign_size`` (number of distinct indicators in the campaign).
+Because the pipeline hands the analyzer one batch at a time, these
+annotations are provisional: an item seen early in a run may join a
+larger campaign when a later batch links it.  :meth:`CampaignClusterAnalyzer.close_run`
+returns the final ID and size for every provisional ID whose items were
+stamped with a different ID or size; the report stores this mapping
+under ``campaigns`` and the briefing resolves IDs through it.  IDs
+missing from the mapping are already final.
+
+Components expire once every indicator in them has outlived the
+retention TTL of its type (see :mod:`~tdc_cyberintelligence.storage.retention`),
+counted from the last run that saw it, so the persisted forest only
+holds live campaigns.
+
+Tags are not used as grouping attributes by default because generic
+labels such as ``phishing`` would collapse unrelated activity into a
+single component; pass ``group_keys`` to change this.
+"""
+
+import hashlib
+import os
+import time
+from array import array
+from datetime import timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence
+
+from .base_analyzer import BaseAnalyzer
+from ..storage.retention import DEFAULT_TTL, DEFAULT_TTLS
+
+
+#: Item fields (also looked up under ``data``) that identify a co‑occurrence group.
+DEFAULT_GROUP_KEYS = ("event_id", "pulse_id", "scan_id", "campaign")
+
+_KEYS_FILE = "nodes.bin"
+# Newline separated keys written by earlier versions
+_LEGACY_KEYS_FILE = "nodes.txt"
+_ARRAYS_FILE = "forest.bin"
+
+
+class UnionFind:
+    """Array‑backed disjoint‑set forest over string keys.
+
+    Besides the parent and size arrays, every root tracks the number of
+    indicator nodes in its component, the oldest node index, which
+    provides a merge‑stable component identifier, and the time (epoch
+    seconds) until which the component is kept.
+    """
+
+    def __init__(self) -> None:
+        self.keys: List[str] = []
+        self.index: Dict[str, int] = {}
+        self.parent = array("q")
+        self.size = array("q")
+        self.members = array("q")
+        self.oldest = array("q")
+        self.expires = array("q")
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def add(self, key: str, member: bool = False) -> int:
+        """Return the node index for ``key``, creating the node if needed."""
+        node = self.index.get(key)
+        if node is None:
+            node = len(self.keys)
+            self.index[key] = node
+            self.keys.append(key)
+            self.parent.append(node)
+            self.size.append(1)
+            self.members.append(1 if member else 0)
+            self.oldest.append(node)
+            self.expires.append(0)
+        return node
+
+    def _arrays(self) -> tuple:
+        return self.parent, self.size, self.members, self.oldest, self.expires
+
+    def keep_until(self, node: int, expires: int) -> None:
+        """Keep the component of ``node`` at least until ``expires``."""
+        root = self.find(node)
+        if expires > self.expires[root]:
+            self.expires[root] = expires
+
+    def find(self, node: int) -> int:
+        parent = self.parent
+        while parent[node] != node:
+            # Path halving keeps trees flat without recursion
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    def union(self, a: int, b: int) -> int:
+        """Merge the components of ``a`` and ``b`` and return the new root."""
+        ra, rb = self.find(a), self.find(b)
+        if ra == rb:
+            return ra
+        if self.size[ra] < self.size[rb]:
+            ra, rb = rb, ra
+        self.parent[rb] = ra
+        self.size[ra] += self.size[rb]
+        self.members[ra] += self.members[rb]
+        if self.oldest[rb] < self.oldest[ra]:
+            self.oldest[ra] = self.oldest[rb]
+        if self.expires[rb] > self.expires[ra]:
+            self.expires[ra] = self.expires[rb]
+        return ra
+
+    def prune(self, now: int) -> int:
+        """Drop every component that expired before ``now``; return the number of nodes removed.
+
+        Surviving nodes are renumbered in their original order and their
+        trees flattened, so :attr:`oldest` keeps identifying the same node.
+        """
+        roots = [self.find(node) for node in range(len(self.keys))]
+        keep = [self.expires[root] >= now for root in roots]
+        if all(keep):
+            return 0
+        remap = array("q", [-1]) * len(self.keys)
+        forest = UnionFind()
+        for node, kept in enumerate(keep):
+            if kept:
+                remap[node] = len(forest.keys)
+                forest.keys.append(self.keys[node])
+        for node, kept in enumerate(keep):
+            if not kept:
+                continue
+            root = roots[node]
+            forest.parent.append(remap[root])
+            forest.size.append(self.size[node])
+            forest.members.append(self.members[node])
+            forest.oldest.append(remap[self.oldest[root]] if node == root else remap[node])
+            forest.expires.append(self.expires[node])
+        removed = len(self.keys) - len(forest.keys)
+        self.keys, self.parent, self.size = forest.keys, forest.parent, forest.size
+        self.members, self.oldest, self.expires = forest.members, forest.oldest, forest.expires
+        self.index = {key: i for i, key in enumerate(self.keys)}
+        return removed
+
+    def save(self, directory: Path) -> None:
+        """Write the forest to ``directory`` (replacing any previous state)."""
+        directory.mkdir(parents=True, exist_ok=True)
+        keys_tmp = directory / (_KEYS_FILE + ".tmp")
+        arrays_tmp = directory / (_ARRAYS_FILE + ".tmp")
+        encoded = [key.encode("utf-8", "surrogatepass") for key in self.keys]
+        with keys_tmp.open("wb") as f:
+            # Key count, one byte length per key, then the concatenated keys
+            array("q", [len(encoded)]).tofile(f)
+            array("q", map(len, encoded)).tofile(f)
+            f.write(b"".join(encoded))
+        with arrays_tmp.open("wb") as f:
+            for buf in self._arrays():
+                buf.tofile(f)
+        os.replace(arrays_tmp, directory / _ARRAYS_FILE)
+        os.replace(keys_tmp, directory / _KEYS_FILE)
+        (directory / _LEGACY_KEYS_FILE).unlink(missing_ok=True)
+
+    @classmethod
+    def load(cls, directory: Path) -> "UnionFind":
+        """Restore a forest written by :meth:`save`; returns an empty one if absent."""
+        forest = cls()
+        keys_path, arrays_path = directory / _KEYS_FILE, directory / _ARRAYS_FILE
+        if not keys_path.exists():
+            keys_path = directory / _LEGACY_KEYS_FILE
+        if not keys_path.exists() or not arrays_path.exists():
+            return forest
+        forest.keys = _read_keys(keys_path)
+        n = len(forest.keys)
+        with arrays_path.open("rb") as f:
+            for buf in forest._arrays():
+                buf.fromfile(f, n)
+        forest.index = {key: i for i, key in enumerate(forest.keys)}
+        return forest
+
+
+def _read_keys(path: Path) -> List[str]:
+    with path.open("rb") as f:
+        if path.name == _LEGACY_KEYS_FILE:
+            # Split on "\n" only; text mode would also split keys containing "\r"
+            return [line.decode("utf-8") for line in f.read().split(b"\n")[:-1]]
+        count = array("q")
+        count.fromfile(f, 1)
+        lengths = array("q")
+        lengths.fromfile(f, count[0])
+        blob = f.read()
+    keys = []
+    offset = 0
+    for length in lengths:
+        keys.append(blob[offset:offset + length].decode("utf-8", "surrogatepass"))
+        offset += length
+    return keys
+
+
+def _campaign_id(key: str) -> str:
+    return "campaign-" + hashlib.blake2b(key.encode(), digest_size=6).hexdigest()
+
+
+class CampaignClusterAnalyzer(BaseAnalyzer):
+    """Annotate indicators with the campaign (connected component) they belong to.
+
+    Parameters
+    ----------
+    state_dir: Path, optional
+        Directory holding the persisted forest.  Defaults to
+        ``CAMPAIGN_STATE_DIR``; when neither is set the state lives in
+        memory only.
+    group_keys: Sequence[str]
+        Item fields that define co‑occurrence groups.  ``tags`` may be
+        included to link indicators sharing a tag.
+    chunk_size: int
+        Number of items linked before their annotations are emitted
+        within one :meth:`analyze` call.  Items in the same chunk always
+        see each other's merges; merges across calls are reported by
+        :meth:`close_run`.
+    ttls: Mapping[str, timedelta], optional
+        Per‑type TTL overrides merged over the retention defaults.
+    """
+
+    def __init__(
+        self,
+        state_dir: Optional[Path] = None,
+        group_keys: Sequence[str] = DEFAULT_GROUP_KEYS,
+        chunk_size: int = 10000,
+        ttls: Optional[Mapping[str, timedelta]] = None,
+    ):
+        state_dir = state_dir or os.environ.get("CAMPAIGN_STATE_DIR")
+        self.state_dir = Path(state_dir) if state_dir else None
+        self.group_keys = tuple(group_keys)
+        self.chunk_size = chunk_size
+        self.ttls = dict(DEFAULT_TTLS)
+        self.ttls.update(ttls or {})
+        self.forest = UnionFind.load(self.state_dir) if self.state_dir else UnionFind()
+        # Provisional campaign ID -> [node it was derived from, smallest
+        # size stamped with it] for this run
+        self._emitted: Dict[str, List[int]] = {}
+
+    def _ttl_seconds(self, ioc_type: Any) -> int:
+        return int(self.ttls.get(str(ioc_type or ""), DEFAULT_TTL).total_seconds())
+
+    def _groups(self, item: Mapping[str, Any]) -> Iterator[str]:
+        data = item.get("data") if isinstance(item.get("data"), Mapping) else {}
+        source = item.get("source", "")
+        for key in self.group_keys:
+            value = item.get(key) or data.get(key)
+            if not value:
+                continue
+            values = value if isinstance(value, (list, tuple, set)) else (value,)
+            for v in values:
+                # Event identifiers are only unique within their source; tags are global
+                yield f"{key}:{v}" if key == "tags" else f"{key}:{source}:{v}"
+
+    def link(self, item: Mapping[str, Any], now: Optional[int] = None) -> int:
+        """Add ``item`` and its group edges to the forest; return its node."""
+        forest = self.forest
+        node = forest.add(f"ioc:{item.get('type', '')}:{item.get('indicator')}", member=True)
+        for group in self._groups(item):
+            forest.union(node, forest.add(group))
+        now = int(time.time()) if now is None else now
+        forest.keep_until(node, now + self._ttl_seconds(item.get("type")))
+        return node
+
+    def annotate(self, item: Mapping[str, Any], node: int) -> Dict[str, Any]:
+        forest = self.forest
+        root = forest.find(node)
+        oldest = forest.oldest[root]
+        campaign_id = _campaign_id(forest.keys[oldest])
+        size = forest.members[root]
+        emitted = self._emitted.get(campaign_id)
+        if emitted is None:
+            self._emitted[campaign_id] = [oldest, size]
+        elif size < emitted[1]:
+            emitted[1] = size
+        item = dict(item)
+        item["campaign_id"] = campaign_id
+        item["campaign_size"] = size
+        return item
+
+    def analyze(self, data: Iterable[Mapping[str, Any]]) -> Iterable[Mapping[str, Any]]:
+        now = int(time.time())
+        chunk: List[Mapping[str, Any]] = []
+        nodes: List[int] = []
+        for item in data:
+            chunk.append(item)
+            nodes.append(self.link(item, now))
+            if len(chunk) >= self.chunk_size:
+                yield from map(self.annotate, chunk, nodes)
+                chunk, nodes = [], []
+        yield from map(self.annotate, chunk, nodes)
+
+    def resolve(self, campaign_id: str) -> Optional[Dict[str, Any]]:
+        """Return the current ``campaign_id``/``campaign_size`` for an ID emitted this run."""
+        emitted = self._emitted.get(campaign_id)
+        return None if emitted is None else self._campaign(emitted[0])
+
+    def _campaign(self, node: int) -> Dict[str, Any]:
+        forest = self.forest
+        root = forest.find(node)
+        return {"campaign_id": _campaign_id(forest.keys[forest.oldest[root]]), "campaign_size": forest.members[root]}
+
+    def close_run(self) -> Dict[str, Dict[str, Any]]:
+        """Return the final campaign of every provisional ID that changed this run.
+
+        Call once the pipeline has finished, before :meth:`save`.  An ID
+        is included when its campaign merged into another one or grew
+        after items were stamped with it; sizes only grow during a run,
+        so comparing against the smallest stamped size is enough.
+        """
+        resolved = {}
+        for campaign_id, (node, stamped_size) in self._emitted.items():
+            final = self._campaign(node)
+            if final["campaign_id"] != campaign_id or final["campaign_size"] != stamped_size:
+                resolved[campaign_id] = final
+        self._emitted = {}
+        return resolved
+
+    def expire(self, now: Optional[float] = None) -> int:
+        """Drop campaigns whose indicators all outlived their TTL; return removed nodes."""
+        return self.forest.prune(int(time.time() if now is None else now))
+
+    def save(self) -> None:
+        """Expire stale campaigns and persist the forest to :attr:`state_dir` (no‑op without one)."""
+        if self.state_dir is not None:
+            self.expire()
+            self.forest.save(self.state_dir)
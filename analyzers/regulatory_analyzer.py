@@ -1,22 +1,93 @@
 """
 Analyzer that maps indicators to regulatory requirements.
 
-This skeleton demonstrates how to classify threats according to
-relevant legislation (e.g. NIS2 or AI‑Act).  A real implementation
-would parse legislation documents and maintain a rule set per sector.
+Indicators are classified according to relevant legislation (e.g.
+NIS2, GDPR or the AI‑Act) using declarative rules matched on type,
+source, tags, asset ranges and severity.  Rules live in YAML or JSON
+files (see :mod:`~tdc_cyberintelligence.analyzers.rule_engine`) and are
+compiled into a dispatch index, so each indicator is only checked
+against candidate rules.  The rule file is re‑read automatically when
+it changes on disk.
+
+By default the bundled ``analyzers/rules`` directory is used; set the
+``REGULATORY_RULES`` environment variable to point at another file or
+directory.
 """
 
-from typing import Iterable, Mapping, Any
+import os
+import threading
+from pathlib import Path
+from typing import Iterable, Mapping, Any, Optional, Tuple
 
 from .base_analyzer import BaseAnalyzer
+from .rule_engine import RuleIndex, compile_rules, load_rule_specs
+
+
+DEFAULT_RULES_PATH = Path(__file__).resolve().parent / "rules"
 
 
 class RegulatoryAnalyzer(BaseAnalyzer):
-    """Annotate indicators with compliance impact."""
+    """Annotate indicators with compliance impact.
+
+    Parameters
+    ----------
+    rules_path: Path, optional
+        Rule file or directory.  Defaults to ``REGULATORY_RULES`` or the
+        bundled rule set.
+    rules: Iterable[Mapping[str, Any]], optional
+        Inline rule dictionaries; when given, ``rules_path`` is ignored and
+        hot‑reloading is disabled.
+    """
+
+    def __init__(self, rules_path: Optional[Path] = None, rules: Optional[Iterable[Mapping[str, Any]]] = None):
+        self._lock = threading.Lock()
+        self._stamp: Optional[Tuple[Tuple[str, int], ...]] = None
+        if rules is not None:
+            self.rules_path = None
+            self.index = compile_rules(rules)
+        else:
+            self.rules_path = Path(rules_path or os.environ.get("REGULATORY_RULES") or DEFAULT_RULES_PATH)
+            self.index = RuleIndex([])
+            self.reload_if_changed()
+
+    def _file_stamp(self) -> Tuple[Tuple[str, int], ...]:
+        path = self.rules_path
+        files = sorted(path.iterdir()) if path.is_dir() else [path]
+        return tuple((str(f), f.stat().st_mtime_ns) for f in files if f.is_file())
+
+    def reload_if_changed(self) -> bool:
+        """Recompile the rule index if the rule files changed on disk.
+
+        A rule file that fails to parse leaves the previous index in
+        place so a bad edit cannot disable compliance mapping.
+
+        Returns
+        -------
+        bool
+            ``True`` if a new index was installed.
+        """
+        if self.rules_path is None or not self.rules_path.exists():
+            return False
+        stamp = self._file_stamp()
+        if stamp == self._stamp:
+            return False
+        with self._lock:
+            if stamp == self._stamp:
+                return False
+            try:
+                index = compile_rules(load_rule_specs(self.rules_path))
+            except Exception:
+                # Keep serving the last good rule set; retry on the next change.
+                self._stamp = stamp
+                return False
+            self.index = index
+            self._stamp = stamp
+            return True
 
     def analyze(self, data: Iterable[Mapping[str, Any]]) -> Iterable[Mapping[str, Any]]:
+        self.reload_if_changed()
+        index = self.index
         for item in data:
             item = dict(item)
-            # Placeholder: assign a dummy compliance category
-            item["compliance"] = []
+            item["compliance"] = [dict(rule.annotation) for rule in index.match(item)]
             yield item
@@ -4,11 +4,14 @@ Analyzer that assigns a confidence or risk score to indicators.
 The risk score reflects the trustworthiness of the source and the
 severity of the indicator.  Sources such as MISP or OTX can have
 higher default confidence because they provide structured data【380051382662935†L65-L113】.
+Indicators that arrive without a ``severity`` are graded from the
+score, so severity‑based compliance rules can match them.
 """
 
 from typing import Iterable, Mapping, Any
 
 from .base_analyzer import BaseAnalyzer
+from .rule_engine import severity_for_score
 
 
 class RiskScoringAnalyzer(BaseAnalyzer):
@@ -28,4 +31,5 @@ class RiskScoringAnalyzer(BaseAnalyzer):
             source_name = item.get("source")
             score = self.DEFAULT_SCORES.get(source_name, 0.5)
             item["confidence"] = score
+            item.setdefault("severity", severity_for_score(score))
             yield item
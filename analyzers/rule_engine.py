@@ -0,0 +1,257 @@
+"""
+Declarative rule engine used by the regulatory analyzer.
+
+Rules are loaded from YAML or JSON files and compiled into a dispatch
+index so that each indicator is only checked against the rules that
+could possibly match it.  A rule file looks like::
+
+    rules:
+      - id: nis2-energy-ransomware
+        regulation: NIS2
+        article: "Art. 23"
+        sector: energy
+        category: incident-reporting
+        match:
+          type: [ip, domain]
+          source: [shodan, otx]
+          tags: [ransomware]
+          asset_ranges: ["192.0.2.0/24"]
+          min_severity: medium
+
+Every key under ``match`` is optional; an omitted key matches anything.
+``type``, ``source`` and ``tags`` accept a single value or a list
+(any‑of).  ``asset_ranges`` only matches indicators that are IP
+addresses inside one of the CIDR ranges.  ``min_severity`` compares
+against the item's ``severity``; items without one are graded from a
+numeric ``confidence`` (see :func:`severity_for_score`).
+
+The index is keyed on ``(type, source)`` and, within each bucket, on
+tag and then on network prefix or severity threshold, so evaluation
+cost depends on the number of *matching* rules rather than the size of
+the rule set.
+"""
+
+import ipaddress
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Set, Tuple
+
+try:
+    import yaml  # type: ignore
+except ImportError:
+    yaml = None  # type: ignore
+
+
+#: Ordering used for ``min_severity`` comparisons.
+SEVERITY_LEVELS = {"info": 0, "low": 1, "medium": 2, "high": 3, "critical": 4}
+
+#: Lower score bounds used to grade a numeric confidence, highest first.
+SCORE_SEVERITY = ((0.95, "critical"), (0.85, "high"), (0.6, "medium"), (0.3, "low"))
+
+WILDCARD = "*"
+
+
+class RuleError(ValueError):
+    """Raised when a rule file cannot be parsed or contains an invalid rule."""
+
+
+def _as_list(value: Any) -> List[str]:
+    if value is None:
+        return []
+    if isinstance(value, (list, tuple, set)):
+        return [str(v) for v in value]
+    return [str(value)]
+
+
+def severity_for_score(score: float) -> str:
+    """Return the severity name for a risk score between 0 and 1."""
+    for bound, name in SCORE_SEVERITY:
+        if score >= bound:
+            return name
+    return "info"
+
+
+def severity_level(item: Mapping[str, Any]) -> Optional[int]:
+    """Return the severity level of ``item``, or ``None`` if it has none.
+
+    An explicit ``severity`` wins; otherwise a numeric ``confidence`` is
+    graded with :func:`severity_for_score` and a textual one (``high``,
+    ``medium`` ...) is used as is.
+    """
+    severity = item.get("severity")
+    if severity is None:
+        severity = item.get("confidence")
+        if isinstance(severity, (int, float)) and not isinstance(severity, bool):
+            severity = severity_for_score(severity)
+    if severity is None:
+        return None
+    return SEVERITY_LEVELS.get(str(severity).lower())
+
+
+class Rule:
+    """A single compiled compliance rule."""
+
+    __slots__ = ("id", "annotation", "types", "sources", "tags", "networks", "min_severity")
+
+    def __init__(self, spec: Mapping[str, Any]):
+        if "id" not in spec:
+            raise RuleError(f"Rule is missing an id: {spec!r}")
+        self.id = str(spec["id"])
+        match = spec.get("match") or {}
+        self.types = _as_list(match.get("type"))
+        self.sources = _as_list(match.get("source"))
+        self.tags = frozenset(_as_list(match.get("tags")))
+        try:
+            self.networks = tuple(ipaddress.ip_network(r, strict=False) for r in _as_list(match.get("asset_ranges")))
+        except ValueError as exc:
+            raise RuleError(f"Rule {self.id}: invalid asset range ({exc})") from exc
+        severity = match.get("min_severity")
+        if severity is not None and str(severity).lower() not in SEVERITY_LEVELS:
+            raise RuleError(f"Rule {self.id}: unknown severity {severity!r}")
+        self.min_severity = SEVERITY_LEVELS[str(severity).lower()] if severity is not None else None
+        # Everything outside ``match`` is copied onto matching indicators
+        self.annotation = {k: v for k, v in spec.items() if k != "match"}
+
+    def matches(self, item: Mapping[str, Any], tags: Set[str], address: Optional[Any], level: Optional[int]) -> bool:
+        """Check the non‑indexed conditions of this rule against ``item``.
+
+        ``level`` is the item's :func:`severity_level`.
+        """
+        if self.tags and not (self.tags & tags):
+            return False
+        if self.networks and (address is None or not any(address in net for net in self.networks)):
+            return False
+        if self.min_severity is not None:
+            if level is None or level < self.min_severity:
+                return False
+        return True
+
+
+class _Bucket:
+    """Rules sharing a ``(type, source)`` key, sub‑indexed by tag, network and severity.
+
+    Rules with tags are filed under each of their tags in a nested
+    bucket (``by_tag``) that indexes their remaining conditions again, so
+    many rules sharing a popular tag are still split by network and
+    severity threshold instead of being checked one by one.
+    """
+
+    __slots__ = ("generic", "by_tag", "by_network", "by_severity")
+
+    def __init__(self):
+        self.generic: List[Rule] = []
+        self.by_tag: Dict[str, _Bucket] = {}
+        # prefix length -> network address -> rules, per IP version
+        self.by_network: Dict[Tuple[int, int], Dict[int, List[Rule]]] = {}
+        # minimum severity level -> rules
+        self.by_severity: Dict[int, List[Rule]] = {}
+
+    def add(self, rule: Rule, by_tag: bool = True) -> None:
+        if by_tag and rule.tags:
+            for tag in rule.tags:
+                bucket = self.by_tag.get(tag)
+                if bucket is None:
+                    bucket = self.by_tag[tag] = _Bucket()
+                bucket.add(rule, by_tag=False)
+        elif rule.networks:
+            for net in rule.networks:
+                key = (net.version, net.prefixlen)
+                self.by_network.setdefault(key, {}).setdefault(int(net.network_address), []).append(rule)
+        elif rule.min_severity is not None:
+            self.by_severity.setdefault(rule.min_severity, []).append(rule)
+        else:
+            self.generic.append(rule)
+
+    def candidates(self, tags: Set[str], address: Optional[Any], level: Optional[int]) -> Iterable[Rule]:
+        yield from self.generic
+        if level is not None and self.by_severity:
+            for threshold in range(level + 1):
+                yield from self.by_severity.get(threshold, ())
+        if address is not None and self.by_network:
+            addr = int(address)
+            width = address.max_prefixlen
+            for (version, prefixlen), networks in self.by_network.items():
+                if version != address.version:
+                    continue
+                masked = addr >> (width - prefixlen) << (width - prefixlen) if prefixlen else 0
+                yield from networks.get(masked, ())
+        if self.by_tag:
+            for tag in tags:
+                bucket = self.by_tag.get(tag)
+                if bucket is not None:
+                    yield from bucket.candidates(tags, address, level)
+
+
+class RuleIndex:
+    """Compiled dispatch index over a set of rules."""
+
+    def __init__(self, rules: Sequence[Rule]):
+        self.rules = list(rules)
+        self._buckets: Dict[Tuple[str, str], _Bucket] = {}
+        self._position: Dict[str, int] = {}
+        for position, rule in enumerate(self.rules):
+            if rule.id in self._position:
+                raise RuleError(f"Duplicate rule id: {rule.id}")
+            self._position[rule.id] = position
+            for ioc_type in rule.types or [WILDCARD]:
+                for source in rule.sources or [WILDCARD]:
+                    self._buckets.setdefault((ioc_type, source), _Bucket()).add(rule)
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def match(self, item: Mapping[str, Any]) -> List[Rule]:
+        """Return the rules matching ``item`` in rule‑file order."""
+        ioc_type = str(item.get("type", ""))
+        source = str(item.get("source", ""))
+        tags = set(_as_list(item.get("tags")))
+        address = _parse_address(item.get("indicator"))
+        level = severity_level(item)
+        matched: Dict[str, Rule] = {}
+        for key in ((ioc_type, source), (ioc_type, WILDCARD), (WILDCARD, source), (WILDCARD, WILDCARD)):
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                continue
+            for rule in bucket.candidates(tags, address, level):
+                if rule.id not in matched and rule.matches(item, tags, address, level):
+                    matched[rule.id] = rule
+        if len(matched) > 1:
+            return sorted(matched.values(), key=lambda r: self._position[r.id])
+        return list(matched.values())
+
+
+def _parse_address(value: Any) -> Optional[Any]:
+    if not isinstance(value, str) or not value or not (value[0].isdigit() or ":" in value):
+        return None
+    try:
+        return ipaddress.ip_address(value)
+    except ValueError:
+        return None
+
+
+def load_rule_specs(path: Path) -> List[Mapping[str, Any]]:
+    """Read raw rule dictionaries from a YAML/JSON file or a directory of them."""
+    path = Path(path)
+    if path.is_dir():
+        specs: List[Mapping[str, Any]] = []
+        for child in sorted(path.iterdir()):
+            if child.suffix in (".json", ".yaml", ".yml"):
+                specs.extend(load_rule_specs(child))
+        return specs
+    text = path.read_text()
+    if path.suffix in (".yaml", ".yml"):
+        if yaml is None:
+            raise RuleError("PyYAML is required to load YAML rule files.")
+        doc = yaml.safe_load(text)
+    else:
+        doc = json.loads(text)
+    if isinstance(doc, Mapping):
+        doc = doc.get("rules", [])
+    if not isinstance(doc, list):
+        raise RuleError(f"{path}: expected a list of rules")
+    return doc
+
+
+def compile_rules(specs: Iterable[Mapping[str, Any]]) -> RuleIndex:
+    """Compile raw rule dictionaries into a :class:`RuleIndex`."""
+    return RuleIndex([Rule(spec) for spec in specs])
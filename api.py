@@ -1,11 +1,20 @@
-
+"""
 Simple FastAPI application to expose parts of the cyber‑intelligence system.
 
 Endpoints:
 
 * ``GET /health`` – basic health check.
 * ``GET /reports/latest`` – return the latest generated intel report as JSON.
-* ``POST /collect-and-analyze`` – trigger collection and analysis on demand and return the result.
+* ``POST /collect-and-analyze`` – trigger collection and analysis on demand and return the result
+  (``?profile=true`` writes profiling output next to the report).  Historical
+  reports are compacted in the background once the response has been sent,
+  at most every ``COMPACTION_INTERVAL_MINUTES``.
+* ``GET /metrics`` – pipeline metrics in the Prometheus text format.
+* ``GET /export/indicators`` – indicators of a report as NDJSON (or Arrow IPC /
+  Parquet when ``pyarrow`` is installed) with ``cursor``/``limit`` pagination
+  and gzip/zstd compression negotiated via ``Accept-Encoding``.
+
+Reports and exports are served straight from the stored bytes.
 
 This API uses the existing collectors and analyzers defined in the package.  To
 run the app, install the required dependencies and execute::
@@ -16,80 +25,65 @@ Cloud Run will automatically supply the environment variable ``PORT``.  The
 Dockerfile included in the repository sets the command appropriately.
 """
 
-import json
 import os
-from datetime import datetime
+import re
+from datetime import timedelta
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Type
+from typing import Optional
+from urllib.parse import urlencode
 
-from fastapi import FastAPI
-from fastapi.responses import JSONResponse
+from fastapi import BackgroundTasks, FastAPI, Header, Query
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
 
-from . import load_plugins
-from .collectors.ioc_collector import IOCCollector
-from .analyzers.correlation_analyzer import CorrelationAnalyzer
-from .analyzers.risk_scoring_analyzer import RiskScoringAnalyzer
-from .briefing.intel_reporter import IntelReporter
+from . import metrics
+from .profiling import get_profiler
+from .runner import run_collection
+from .storage import export
+from .storage.retention import Compactor
 
 
 app = FastAPI(title="Cyber Intelligence API")
 
 
+@lru_cache(maxsize=None)
+def _compactor(reports_dir: Path) -> Compactor:
+    # One instance per directory so concurrent requests share its lock
+    return Compactor(reports_dir)
+
+
+def _compaction_interval() -> timedelta:
+    return timedelta(minutes=int(os.environ.get("COMPACTION_INTERVAL_MINUTES", "60")))
+
+
 @app.get("/health")
 def health_check():
     return {"status": "ok"}
 
 
+@app.get("/metrics")
+def get_metrics():
+    """Expose pipeline metrics for Prometheus scraping."""
+    return Response(content=metrics.REGISTRY.render(), media_type=metrics.CONTENT_TYPE_LATEST)
+
+
 @app.post("/collect-and-analyze")
-def collect_and_analyze():
-    """Trigger immediate collection and analysis and return the results."""
-    # Load source plugins dynamically
-    sources: List[Type] = load_plugins()
-    instances = []
-    for src_cls in sources:
-        try:
-            instance = None
-            if src_cls.name == "misp":
-             instance = src_cls()
-            elif src_cls.name == "otx":
-                instance = src_cls(api_key=os.environ.get("OTX_KEY", ""))
-            elif src_cls.name == "shodan":
-                instance = src_cls(api_key=os.environ.get("SHODAN_KEY", ""))
-            elif src_cls.name == "hibp":
-                instance = src_cls(api_key=os.environ.get("HIBP_KEY", ""))
-            elif src_cls.name == "cfcs":
-                instance = src_cls()
-            if instance:
-                instances.append(instance)
-        except Exception:
-            continue
-    # Collect and analyse
-    collector = IOCCollector(instances)
-    data = collector.collect()
-    analyzers = [CorrelationAnalyzer(), RiskScoringAnalyzer()]
-    for analyzer in analyzers:
-        data = list(analyzer.analyze(data))
-    # Write to file and return JSON
-    reporter = IntelReporter()
-    output = reporter.generate(data)
+def collect_and_analyze(background_tasks: BackgroundTasks, profile: bool = False):
+    """Trigger immediate collection and analysis and return the results.
+
+    Pass ``?profile=true`` (or set ``PROFILE_RUNS``) to write profiling
+    output next to the generated report.  Compaction of older reports
+    is scheduled as a background task after the response when the last
+    one is older than ``COMPACTION_INTERVAL_MINUTES``.
+    """
+    profiler = get_profiler(profile)
     reports_dir = Path(os.environ.get("REPORTS_DIR", "reports"))
-    reports_dir.mkdir(parents=True, exist_ok=True)
-   
-        # Write indicators to BigQuery if environment variables are set
-    bq_project = os.environ.get("BQ_PROJECT")
-    bq_dataset = os.environ.get("BQ_DATASET")
-    bq_table = os.environ.get("BQ_TABLE")
-    if bq_project and bq_dataset and bq_table:
-        try:
-            bq_writer = BigQueryWriter(bq_project, bq_dataset, bq_table)
-            bq_writer.write_indicators(data)
-        except Exception:
-            # Ignore BigQuery errors to avoid failing the entire request
-            pass
-timestamp = datetime.utcnow().strftime("%Y%m%dT%H%M%SZ")
-    path = reports_dir / f"intel_report_{timestamp}.json"
-    path.write_text(output)
-    return JSONResponse(content=json.loads(output))
+    path = run_collection(reports_dir, profiler, trigger="api")
+    profiler.write(reports_dir, path.stem)
+    compactor = _compactor(reports_dir)
+    if compactor.due(_compaction_interval()):
+        background_tasks.add_task(compactor.compact)
+    return FileResponse(path, media_type="application/json")
 
 
 @app.get("/reports/latest")
@@ -101,9 +95,61 @@ def get_latest_report():
     reports = sorted(reports_dir.glob("intel_report_*.json"), reverse=True)
     if not reports:
         return JSONResponse(content={"error": "No reports available"}, status_code=404)
-    latest = reports[0]
-    try:
-        data = json.loads(latest.read_text())
-        return JSONResponse(content=data)
-    except Exception:
-        return JSONResponse(content={"error": "Failed to read report"}, status_code=500)
+    return FileResponse(reports[0], media_type="application/json")
+
+
+_REPORT_NAME = re.compile(r"^intel_report_[0-9A-Za-z]+$")
+
+
+@app.get("/export/indicators")
+def export_indicators(
+    format: str = "ndjson",
+    cursor: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1),
+    report: Optional[str] = None,
+    accept_encoding: Optional[str] = Header(None),
+):
+    """Stream the indicators of a report for bulk consumers.
+
+    Without ``cursor``/``limit`` the complete export is returned (and
+    cached per format and encoding).  Paged responses carry
+    ``X-Next-Cursor`` and a ``Link: rel="next"`` header pinned to the
+    same report, so a client can walk a snapshot consistently.  Once a
+    newer report exists, compaction removes the pinned report but keeps
+    its export for ``EXPORT_GRACE_HOURS`` (default 24); a walk must
+    finish within that window or the next page returns 404.  ``limit``
+    must be at least 1.
+    """
+    if format not in export.supported_formats():
+        return JSONResponse(
+            content={"error": f"Unsupported format {format!r}", "supported": export.supported_formats()},
+            status_code=406,
+        )
+    reports_dir = Path(os.environ.get("REPORTS_DIR", "reports"))
+    if report is not None:
+        if not _REPORT_NAME.match(report):
+            return JSONResponse(content={"error": "Invalid report name"}, status_code=400)
+        candidates = [reports_dir / f"{report}.json"]
+    else:
+        candidates = sorted(reports_dir.glob("intel_report_*.json"), reverse=True)
+    report_path = next((p for p in candidates if export.export_path(p).exists()), None)
+    if report_path is None:
+        return JSONResponse(content={"error": "No export available"}, status_code=404)
+
+    reader = export.ExportReader(export.export_path(report_path))
+    encoding = "identity" if format == "parquet" else export.negotiate_encoding(accept_encoding)
+    headers = {"Vary": "Accept-Encoding", "X-Report": report_path.stem, "X-Total-Count": str(reader.count)}
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    media_type = export.MEDIA_TYPES[format]
+
+    if cursor <= 0 and limit is None:
+        return FileResponse(export.cached_full_export(reader, format, encoding), media_type=media_type, headers=headers)
+
+    start, end, next_cursor = reader.byte_range(cursor, limit)
+    if next_cursor < reader.count:
+        query = {"format": format, "cursor": next_cursor, "limit": limit, "report": report_path.stem}
+        headers["X-Next-Cursor"] = str(next_cursor)
+        headers["Link"] = f'</export/indicators?{urlencode(query)}>; rel="next"'
+    body = export.compress_stream(export.page_chunks(reader, format, start, end), encoding)
+    return StreamingResponse(body, media_type=media_type, headers=headers)
@@ -0,0 +1 @@
+"""Benchmark harness with synthetic feeds for the full pipeline."""
@@ -0,0 +1,248 @@
+"""
+Benchmark runner for the collection, analysis and reporting pipeline.
+
+Each stage is driven with data produced by
+:mod:`~tdc_cyberintelligence.benchmarks.synthetic_sources` and timed
+over several repetitions.  The runner reports throughput (items per
+second), latency percentiles and the peak memory allocated by each
+stage, and can store the results as a baseline or compare against a
+previous baseline to catch regressions.  Peak memory is measured with
+:mod:`tracemalloc` in a separate, untimed repetition so tracing does not
+skew the latencies, and the peak is reset before every stage so each
+stage is charged only for its own allocations.  Run it with::
+
+    python -m tdc_cyberintelligence.benchmarks.run_benchmarks --scale 100000
+    python -m tdc_cyberintelligence.benchmarks.run_benchmarks --save-baseline
+    python -m tdc_cyberintelligence.benchmarks.run_benchmarks --compare
+
+The process exits with status 1 when a stage regresses beyond the
+configured tolerance.  ``baselines.json`` ships a baseline for the
+default scale; regenerate it with ``--save-baseline`` on the machine
+that runs the comparison.
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from ..collectors.ioc_collector import IOCCollector
+from ..analyzers.anomaly_analyzer import AnomalyAnalyzer
+from ..analyzers.campaign_analyzer import CampaignClusterAnalyzer
+from ..analyzers.correlation_analyzer import CorrelationAnalyzer
+from ..analyzers.regulatory_analyzer import RegulatoryAnalyzer
+from ..analyzers.risk_scoring_analyzer import RiskScoringAnalyzer
+from ..briefing.executive_briefing import ExecutiveBriefing
+from ..briefing.intel_reporter import IntelReporter
+from ..briefing.markdown_renderer import MarkdownRenderer
+from ..bigquery_writer import BigQueryWriter
+from ..pipeline import Pipeline
+from ..storage import export
+from .synthetic_sources import FakeBigQueryClient, build_sources
+
+
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baselines.json"
+
+Stage = Tuple[str, Callable[[List[Mapping[str, Any]]], Any]]
+
+
+def measure_peak_mb(func: Callable[[], Any]) -> float:
+    """Return the peak Python heap growth in MiB while running ``func``."""
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        func()
+        return max(tracemalloc.get_traced_memory()[1] - baseline, 0) / (1024 * 1024)
+    finally:
+        if started:
+            tracemalloc.stop()
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    """Return the ``pct`` percentile of ``values`` using linear interpolation."""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    k = (len(ordered) - 1) * pct / 100.0
+    lo = int(k)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+def _consume(result: Any) -> Any:
+    """Force lazy analyzer generators so their cost is measured."""
+    if isinstance(result, (str, bytes, list, dict)) or result is None:
+        return result
+    return list(result)
+
+
+def build_stages() -> List[Stage]:
+    """Return the pipeline stages to benchmark, in pipeline order."""
+    writer = BigQueryWriter("bench", "bench", "bench", client=FakeBigQueryClient())
+    return [
+        ("analyzer.correlation", lambda data: _consume(CorrelationAnalyzer().analyze(data))),
+        ("analyzer.risk_scoring", lambda data: _consume(RiskScoringAnalyzer().analyze(data))),
+        ("analyzer.regulatory", lambda data: _consume(RegulatoryAnalyzer().analyze(data))),
+        ("analyzer.campaign", lambda data: _consume(CampaignClusterAnalyzer().analyze(data))),
+        ("analyzer.anomaly", lambda data: _consume(AnomalyAnalyzer().analyze(data))),
+        ("report.intel_reporter", lambda data: IntelReporter().generate(data)),
+        ("report.markdown", lambda data: MarkdownRenderer().render_table(data)),
+        ("report.executive_briefing", lambda data: ExecutiveBriefing().generate(data)),
+        ("sink.bigquery", lambda data: writer.write_indicators(data)),
+    ]
+
+
+def _summarise(name: str, timings: List[float], items: int, peak_mb: float) -> Dict[str, Any]:
+    p50 = percentile(timings, 50)
+    return {
+        "stage": name,
+        "items": items,
+        "runs": len(timings),
+        "throughput": items / p50 if p50 else float("inf"),
+        "p50_s": p50,
+        "p90_s": percentile(timings, 90),
+        "p99_s": percentile(timings, 99),
+        "peak_mem_mb": peak_mb,
+    }
+
+
+def run(scale: int = 100000, repeat: int = 5, n_sources: int = 4, duplicate_ratio: float = 0.3) -> Dict[str, Dict[str, Any]]:
+    """Run every stage ``repeat`` times and return per‑stage results."""
+    results: Dict[str, Dict[str, Any]] = {}
+
+    def collect() -> List[Mapping[str, Any]]:
+        return list(IOCCollector(build_sources(scale, n_sources, duplicate_ratio)).collect())
+
+    timings: List[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        collect()
+        timings.append(time.perf_counter() - start)
+    # The measured run's output is kept as input for the remaining stages
+    collected: List[List[Mapping[str, Any]]] = []
+    peak = measure_peak_mb(lambda: collected.append(collect()))
+    data = collected.pop()
+    results["collector"] = _summarise("collector", timings, scale, peak)
+
+    for name, func in build_stages():
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func(data)
+            timings.append(time.perf_counter() - start)
+        peak = measure_peak_mb(lambda: func(data))
+        results[name] = _summarise(name, timings, len(data), peak)
+
+    # End to end through the bounded-queue pipeline with the report, export
+    # and (fake) BigQuery sinks; the collected data is released so only the
+    # pipeline's own memory counts
+    data = []
+
+    def run_pipeline() -> None:
+        # Same analyzers and sinks as a production run, with state and
+        # report files in a scratch directory
+        with tempfile.TemporaryDirectory() as scratch:
+            store = Path(scratch)
+            campaigns = CampaignClusterAnalyzer(store / "campaigns")
+            anomalies = AnomalyAnalyzer(store / "anomaly_state.json")
+            writer = BigQueryWriter("bench", "bench", "bench", client=FakeBigQueryClient())
+            report_path = store / "intel_report_bench.json"
+            with report_path.open("w") as fh:
+                report = IntelReporter().open_stream(fh)
+                ndjson = export.ExportWriter(export.export_path(report_path))
+                Pipeline(
+                    IOCCollector(build_sources(scale, n_sources, duplicate_ratio), observers=[anomalies.observe]),
+                    [CorrelationAnalyzer(), RiskScoringAnalyzer(), RegulatoryAnalyzer(), campaigns, anomalies],
+                    [export.tee_encoded(report, ndjson), writer.write_indicators],
+                ).run()
+                report.close({"campaigns": campaigns.close_run()})
+                ndjson.close()
+            campaigns.save()
+            anomalies.close_run()
+            anomalies.save()
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run_pipeline()
+        timings.append(time.perf_counter() - start)
+    peak = measure_peak_mb(run_pipeline)
+    results["pipeline.end_to_end"] = _summarise("pipeline.end_to_end", timings, scale, peak)
+    return results
+
+
+def compare(
+    results: Mapping[str, Mapping[str, Any]], baseline: Mapping[str, Mapping[str, Any]], tolerance: float
+) -> List[str]:
+    """Return a list of human‑readable regressions against ``baseline``."""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        if current["p50_s"] > previous["p50_s"] * (1 + tolerance):
+            regressions.append(
+                f"{name}: p50 {current['p50_s']:.4f}s vs baseline {previous['p50_s']:.4f}s"
+            )
+        prev_mem, cur_mem = previous.get("peak_mem_mb"), current.get("peak_mem_mb")
+        if prev_mem and cur_mem and cur_mem > prev_mem * (1 + tolerance):
+            regressions.append(f"{name}: peak memory {cur_mem:.1f}MiB vs baseline {prev_mem:.1f}MiB")
+    return regressions
+
+
+def format_table(results: Mapping[str, Mapping[str, Any]]) -> str:
+    headers = ["Stage", "Items", "Items/s", "p50 (ms)", "p90 (ms)", "p99 (ms)", "Peak mem (MiB)"]
+    lines = ["| " + " | ".join(headers) + " |", "| " + " | ".join(["---"] * len(headers)) + " |"]
+    for r in results.values():
+        mem = f"{r['peak_mem_mb']:.1f}" if r.get("peak_mem_mb") is not None else "n/a"
+        lines.append(
+            f"| {r['stage']} | {r['items']} | {r['throughput']:.0f} | {r['p50_s'] * 1000:.1f} | "
+            f"{r['p90_s'] * 1000:.1f} | {r['p99_s'] * 1000:.1f} | {mem} |"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the cyber‑intelligence pipeline.")
+    parser.add_argument("--scale", type=int, default=100000, help="Total synthetic items across all sources.")
+    parser.add_argument("--repeat", type=int, default=5, help="Repetitions per stage.")
+    parser.add_argument("--sources", type=int, default=4, help="Number of synthetic sources.")
+    parser.add_argument("--duplicate-ratio", type=float, default=0.3, help="Fraction of duplicated items per source.")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help="Baseline JSON file.")
+    parser.add_argument("--save-baseline", action="store_true", help="Store results as the new baseline.")
+    parser.add_argument("--compare", action="store_true", help="Fail if results regress against the baseline.")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative slowdown before failing.")
+    args = parser.parse_args(argv)
+
+    results = run(args.scale, args.repeat, args.sources, args.duplicate_ratio)
+    print(format_table(results))
+
+    # Baselines are keyed by scale so runs at different sizes don't clash
+    key = str(args.scale)
+    stored: Dict[str, Any] = {}
+    if args.baseline.exists():
+        stored = json.loads(args.baseline.read_text())
+    if args.save_baseline:
+        stored[key] = results
+        args.baseline.write_text(json.dumps(stored, indent=2))
+        print(f"Saved baseline for scale {key} to {args.baseline}")
+    if args.compare:
+        if key not in stored:
+            print(f"No baseline for scale {key} in {args.baseline}")
+            return 1
+        regressions = compare(results, stored[key], args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
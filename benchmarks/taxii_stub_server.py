@@ -0,0 +1,157 @@
+"""
+Local stand‑in for a TAXII 2.1 server and STIX bundle generator.
+
+Useful for exercising :class:`~tdc_cyberintelligence.sources.stix_source.StixSource`
+without network access.  Objects are generated deterministically on
+the fly, so arbitrarily large collections can be served in constant
+memory.  Run it with::
+
+    python -m tdc_cyberintelligence.benchmarks.taxii_stub_server --port 9000 --objects 1000000
+
+and point the source at
+``TAXII_URL=http://localhost:9000/api1/collections/bench/objects/``.
+:func:`write_bundle` writes the same objects to a local bundle file.
+"""
+
+import argparse
+import json
+import random
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Sequence
+from urllib.parse import parse_qs, urlparse
+
+from .synthetic_sources import make_indicator
+
+
+_PATTERNS = {
+    "ip": "[ipv4-addr:value = '{}']",
+    "domain": "[domain-name:value = '{}']",
+    "url": "[url:value = '{}']",
+    "hash": "[file:hashes.'SHA-256' = '{}']",
+}
+_BASE_TIME = datetime(2024, 1, 1)
+
+
+def _timestamp(i: int) -> str:
+    return (_BASE_TIME + timedelta(seconds=i)).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+
+def make_object(i: int, seed: int = 0) -> Dict[str, Any]:
+    """Return the ``i``‑th synthetic STIX indicator object."""
+    rng = random.Random(seed * 1_000_003 + i)
+    ioc_type = rng.choice(list(_PATTERNS))
+    return {
+        "type": "indicator",
+        "spec_version": "2.1",
+        "id": f"indicator--{i:08x}-0000-4000-8000-{seed:012x}",
+        "created": _timestamp(i),
+        "modified": _timestamp(i),
+        "valid_from": _timestamp(i),
+        "pattern_type": "stix",
+        "pattern": _PATTERNS[ioc_type].format(make_indicator(rng, ioc_type)),
+        "indicator_types": [rng.choice(["malicious-activity", "anomalous-activity", "compromised"])],
+        "labels": [rng.choice(["ransomware", "phishing", "c2", "botnet"])],
+        "confidence": rng.randint(10, 100),
+    }
+
+
+def iter_objects(start: int, stop: int, seed: int = 0) -> Iterator[Dict[str, Any]]:
+    for i in range(start, stop):
+        yield make_object(i, seed)
+
+
+def write_bundle(path: Path, count: int, seed: int = 0) -> Path:
+    """Stream a STIX bundle with ``count`` indicator objects to ``path``."""
+    path = Path(path)
+    with path.open("w") as f:
+        f.write('{"type": "bundle", "id": "bundle--00000000-0000-4000-8000-000000000000", "objects": [\n')
+        for i, obj in enumerate(iter_objects(0, count, seed)):
+            if i:
+                f.write(",\n")
+            f.write(json.dumps(obj))
+        f.write("\n]}\n")
+    return path
+
+
+class TaxiiStubHandler(BaseHTTPRequestHandler):
+    """Serve ``GET .../objects/`` with ``limit``, ``next`` and ``added_after`` support."""
+
+    total_objects = 10000
+    seed = 0
+    max_page_size = 10000
+
+    def log_message(self, format: str, *args: Any) -> None:
+        return None
+
+    def do_GET(self) -> None:
+        url = urlparse(self.path)
+        if not url.path.rstrip("/").endswith("/objects"):
+            self.send_error(404)
+            return
+        query = parse_qs(url.query)
+        limit = min(int(query.get("limit", [self.max_page_size])[0]), self.max_page_size)
+        # Object i was "added" at _BASE_TIME + i seconds
+        first = 0
+        if "added_after" in query:
+            added_after = datetime.strptime(query["added_after"][0][:19], "%Y-%m-%dT%H:%M:%S")
+            first = int((added_after - _BASE_TIME).total_seconds()) + 1
+        start = first
+        if "next" in query:
+            # ``next`` continues the session it came from, so it is only
+            # valid together with that session's ``added_after``
+            session, _, position = query["next"][0].partition(":")
+            if session != str(first):
+                self.send_error(400, "next token does not match added_after")
+                return
+            start = int(position)
+        stop = min(start + limit, self.total_objects)
+        more = stop < self.total_objects
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/taxii+json;version=2.1")
+        if stop > start:
+            self.send_header("X-TAXII-Date-Added-First", _timestamp(start))
+            self.send_header("X-TAXII-Date-Added-Last", _timestamp(stop - 1))
+        self.end_headers()
+        # Objects are written one by one; the envelope fields trail the array
+        self.wfile.write(b'{"objects": [')
+        for i, obj in enumerate(iter_objects(start, stop, self.seed)):
+            if i:
+                self.wfile.write(b",")
+            self.wfile.write(json.dumps(obj).encode())
+        trailer: Dict[str, Any] = {"more": more}
+        if more:
+            trailer["next"] = f"{first}:{stop}"
+        self.wfile.write(b"], " + json.dumps(trailer)[1:].encode())
+
+
+def make_server(port: int = 9000, total_objects: int = 10000, seed: int = 0, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """Return an unstarted server; call ``serve_forever`` (optionally in a thread)."""
+    handler = type("ConfiguredTaxiiStubHandler", (TaxiiStubHandler,), {"total_objects": total_objects, "seed": seed})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Serve synthetic STIX objects over a TAXII‑like API.")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--objects", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--write-bundle", type=Path, help="Write a bundle file instead of serving.")
+    args = parser.parse_args(argv)
+    if args.write_bundle:
+        write_bundle(args.write_bundle, args.objects, args.seed)
+        print(f"Wrote {args.objects} objects to {args.write_bundle}")
+        return 0
+    server = make_server(args.port, args.objects, args.seed)
+    print(f"Serving {args.objects} STIX objects on http://127.0.0.1:{args.port}/api1/collections/bench/objects/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -9,6 +9,8 @@ library to be installed and credentials to be available in the environment.
 from typing import Iterable, Mapping, Any
 import os
 
+from . import metrics
+
 try:
     from google.cloud import bigquery  # type: ignore
 except ImportError:
@@ -17,14 +19,19 @@ except ImportError:
 class BigQueryWriter:
     """Write indicator dictionaries into a BigQuery table."""
 
-    def __init__(self, project_id: str, dataset_id: str, table_id: str) -> None:
-        if bigquery is None:
+    def __init__(
+        self, project_id: str, dataset_id: str, table_id: str, client: Any = None, max_rows_per_request: int = 500
+    ) -> None:
+        if client is None and bigquery is None:
             raise ImportError("google-cloud-bigquery is not installed.")
         self.project_id = project_id
         self.dataset_id = dataset_id
         self.table_id = table_id
-        # Initialize BigQuery client; uses default credentials from env
-        self.client = bigquery.Client(project=self.project_id)
+        # Streaming inserts are limited in size; large batches are split
+        self.max_rows_per_request = max_rows_per_request
+        # Initialize BigQuery client; uses default credentials from env.
+        # A pre-built client (e.g. a fake for benchmarks) may be injected.
+        self.client = client if client is not None else bigquery.Client(project=self.project_id)
 
     def write_indicators(self, indicators: Iterable[Mapping[str, Any]]) -> None:
         """Insert a collection of indicator dicts into BigQuery.
@@ -54,6 +61,12 @@ class BigQueryWriter:
             rows_to_insert.append(row)
         if not rows_to_insert:
             return
-        errors = self.client.insert_rows_json(table_ref, rows_to_insert)
+        errors = []
+        step = self.max_rows_per_request or len(rows_to_insert)
+        for i in range(0, len(rows_to_insert), step):
+            chunk = rows_to_insert[i:i + step]
+            with metrics.span("bigquery.flush", rows=len(chunk)), metrics.BIGQUERY_FLUSH_SECONDS.time():
+                errors.extend(self.client.insert_rows_json(table_ref, chunk))
+            metrics.BIGQUERY_ROWS.inc(len(chunk))
         if errors:
             raise RuntimeError(f"BigQuery insertion errors: {errors}")
@@ -3,35 +3,157 @@ Generator for executive briefings.
 
 Executive briefings summarise the threat landscape and map it to
 business impact.  They are intended for senior stakeholders and
-therefore emphasise clarity and actionable recommendations.
+therefore emphasise clarity and actionable recommendations: instead of
+listing every indicator, a briefing reports totals, breakdowns by type,
+source and regulation, and the top‑N indicators by confidence, all
+computed in a single pass.  When indicators carry campaign annotations
+(see :mod:`~tdc_cyberintelligence.analyzers.campaign_analyzer`) the
+briefing lists the largest campaigns with their dominant indicator
+types and tags in place of raw indicators.
+
+Generated briefings are cached by a fingerprint of the indicator set,
+so repeated calls with unchanged data return the cached text without
+re‑rendering.  Callers that can identify their input cheaply (for
+instance a report file and its modification time, see
+:func:`file_cache_key`) pass it as ``key`` and skip the scan as well.
+:meth:`ExecutiveBriefing.generate_report` does both for a stored intel
+report and resolves provisional campaign IDs through its ``campaigns``
+mapping.
 """
 
+import io
+import json
+import os
+from collections import Counter, OrderedDict
 from datetime import datetime
-from typing import Iterable, Mapping, Any
+from pathlib import Path
+from typing import Iterable, List, Mapping, Any, Optional, TextIO, Tuple
+
+from .summary import IndicatorSummary
+
+
+def file_cache_key(path: "os.PathLike[str]") -> str:
+    """Return a cache key for the contents of ``path`` without reading it."""
+    stat = os.stat(path)
+    return f"{os.fspath(path)}:{stat.st_mtime_ns}:{stat.st_size}"
+
+
+def _ranked(counts: Counter, n: Optional[int] = None) -> List[Tuple[Any, int]]:
+    # Ties are ordered by key so the text does not depend on input order
+    return sorted(counts.items(), key=lambda kv: (-kv[1], str(kv[0])))[:n]
 
 
 class ExecutiveBriefing:
-    """Produce a textual executive briefing."""
+    """Produce a textual executive briefing.
 
-    def __init__(self, title: str = "Executive Briefing"):
+    Parameters
+    ----------
+    title: str
+        Heading of the briefing.
+    top_n: int
+        Number of highest‑confidence indicators to list.
+    cache_size: int
+        Number of rendered briefings kept in the cache.
+    """
+
+    def __init__(self, title: str = "Executive Briefing", top_n: int = 10, cache_size: int = 8):
         self.title = title
+        self.top_n = top_n
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
 
-    def generate(self, data: Iterable[Mapping[str, Any]]) -> str:
+    def generate(
+        self,
+        data: Iterable[Mapping[str, Any]],
+        key: Optional[str] = None,
+        campaigns: Optional[Mapping[str, Mapping[str, Any]]] = None,
+    ) -> str:
         """Return a plain‑text briefing.
 
         Parameters
         ----------
         data: Iterable[Mapping[str, Any]]
             Enriched indicator dictionaries.
+        key: str, optional
+            Caller‑supplied identity of ``data`` (e.g. :func:`file_cache_key`
+            of the report it was read from).  A cached briefing for the key
+            is returned before ``data`` is consumed at all.
+        campaigns: Mapping[str, Mapping[str, Any]], optional
+            Final campaign per provisional ``campaign_id`` (the report's
+            ``campaigns`` member).
 
         Returns
         -------
         str
             A formatted briefing summarising the indicators.
         """
-        lines = [self.title, f"Generated: {datetime.utcnow().isoformat()}Z", ""]
-        for item in data:
-            indicator = item.get("indicator", "<unknown>")
-            confidence = item.get("confidence", "?")
-            lines.append(f"- Indicator: {indicator} (confidence {confidence})")
-        return "\n".join(lines)
+        if key is not None:
+            cached = self._cached("key:" + key)
+            if cached is not None:
+                return cached
+        summary = IndicatorSummary(self.top_n, campaigns).update(data)
+        fingerprint = "fp:" + summary.fingerprint
+        text = self._cached(fingerprint)
+        if text is None:
+            buffer = io.StringIO()
+            self._write(summary, buffer)
+            text = buffer.getvalue().rstrip("\n")
+            self._store(fingerprint, text)
+        if key is not None:
+            self._store("key:" + key, text)
+        return text
+
+    def generate_report(self, path: "os.PathLike[str]") -> str:
+        """Return the briefing for a stored intel report, reading it only on a cache miss."""
+        key = file_cache_key(path)
+        cached = self._cached("key:" + key)
+        if cached is not None:
+            return cached
+        doc = json.loads(Path(path).read_text())
+        return self.generate(doc.get("items", []), key, doc.get("campaigns"))
+
+    def _cached(self, key: str) -> Optional[str]:
+        text = self._cache.get(key)
+        if text is not None:
+            self._cache.move_to_end(key)
+        return text
+
+    def _store(self, key: str, text: str) -> None:
+        self._cache[key] = text
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def write(self, data: Iterable[Mapping[str, Any]], sink: TextIO, key: Optional[str] = None) -> None:
+        """Write the briefing for ``data`` to a file‑like ``sink``."""
+        sink.write(self.generate(data, key))
+        sink.write("\n")
+
+    def _write(self, summary: IndicatorSummary, sink: TextIO) -> None:
+        sink.write(f"{self.title}\nGenerated: {datetime.utcnow().isoformat()}Z\n\n")
+        sink.write(f"Indicators observed: {summary.total}\n")
+        for label, counts in (("By type", summary.by_type), ("By source", summary.by_source),
+                              ("Regulatory impact", summary.by_compliance)):
+            if not counts:
+                continue
+            sink.write(f"\n{label}:\n")
+            for key, count in _ranked(counts):
+                sink.write(f"- {key}: {count}\n")
+        campaigns = summary.top_campaigns(self.top_n)
+        if campaigns:
+            sink.write(f"\nCampaigns: {len(summary.campaigns)} (top {len(campaigns)} by activity)\n")
+            for campaign in campaigns:
+                types = ", ".join(str(t) for t, _ in _ranked(campaign.types, 3))
+                tags = ", ".join(str(t) for t, _ in _ranked(campaign.tags, 3)) or "untagged"
+                sink.write(
+                    f"- {campaign.campaign_id}: {campaign.observed} indicators this run "
+                    f"({campaign.size} total; {types}; {tags}), e.g. {campaign.example}\n"
+                )
+            return
+        top = summary.top()
+        if top:
+            sink.write(f"\nTop {len(top)} indicators by confidence:\n")
+            for item in top:
+                indicator = item.get("indicator", "<unknown>")
+                confidence = item.get("confidence", "?")
+                sink.write(f"- Indicator: {indicator} (confidence {confidence})\n")
@@ -5,11 +5,15 @@ This module takes the output from analyzers and produces structured
 documents (e.g. JSON or Markdown) that can be fed into a RAG model or
 stored for later analysis.  The documents contain metadata such as
 timestamp, source and confidence score.
+
+:meth:`IntelReporter.open_stream` writes the same document
+incrementally, so a pipeline can append batches of items without
+holding the full item list in memory.
 """
 
 import json
 from datetime import datetime
-from typing import Iterable, Mapping, Any
+from typing import Iterable, Mapping, Any, Optional, TextIO
 
 
 class IntelReporter:
@@ -37,3 +41,39 @@ class IntelReporter:
             "items": list(data),
         }
         return json.dumps(doc, indent=2)
+
+    def open_stream(self, sink: TextIO) -> "ReportStream":
+        """Start an incrementally written intel document on ``sink``."""
+        return ReportStream(self.name, sink)
+
+
+class ReportStream:
+    """Append items to a JSON intel document as they arrive.
+
+    The output has the same structure as :meth:`IntelReporter.generate`;
+    call :meth:`close` to terminate the ``items`` array.
+    """
+
+    def __init__(self, name: str, sink: TextIO, generated_at: Optional[str] = None):
+        self.sink = sink
+        self.count = 0
+        header = {"name": name, "generated_at": generated_at or datetime.utcnow().isoformat() + "Z"}
+        # Reuse json.dumps for the header and leave the items array open
+        sink.write(json.dumps(header, indent=2)[:-2] + ',\n  "items": [')
+
+    def write(self, items: Iterable[Mapping[str, Any]]) -> None:
+        self.write_encoded(json.dumps(item, default=str) for item in items)
+
+    def write_encoded(self, lines: Iterable[str]) -> None:
+        """Append items that are already JSON‑encoded."""
+        for line in lines:
+            self.sink.write(",\n    " if self.count else "\n    ")
+            self.sink.write(line)
+            self.count += 1
+
+    def close(self, extra: Optional[Mapping[str, Any]] = None) -> None:
+        """Terminate the document, adding ``extra`` top‑level members after ``items``."""
+        self.sink.write("\n  ]" if self.count else "]")
+        for key, value in (extra or {}).items():
+            self.sink.write(f",\n  {json.dumps(key)}: {json.dumps(value, default=str)}")
+        self.sink.write("\n}")
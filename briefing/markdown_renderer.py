@@ -1,17 +1,66 @@
 """
 Renderers for turning analysis results into Markdown.
 
-This simple renderer converts a list of enriched indicators into a
-Markdown table.  More sophisticated renderers could include plots
-generated with matplotlib or plotly.
+This renderer converts enriched indicators into Markdown tables.  Rows
+are written incrementally to any file‑like sink using a precompiled row
+template, so large runs never build the whole document in memory.
+Tables can be paginated or split across several files, and
+:meth:`MarkdownRenderer.render_summary` produces a compact overview
+(counts per type/source and the top‑N indicators) computed in a single
+pass.  More sophisticated renderers could include plots generated with
+matplotlib or plotly.
 """
 
-from typing import Iterable, Mapping, Any
+import io
+from pathlib import Path
+from typing import Any, Iterable, Iterator, List, Mapping, Optional, TextIO
+
+from .summary import IndicatorSummary
+
+
+HEADERS = ["Indicator", "Type", "Source", "Confidence"]
+_FIELDS = ["indicator", "type", "source", "confidence"]
+
+#: Precompiled header block and row template shared by all tables.
+_HEADER_BLOCK = "| " + " | ".join(HEADERS) + " |\n" + "| " + " | ".join(["---"] * len(HEADERS)) + " |\n"
+_ROW_TEMPLATE = "| {} | {} | {} | {} |\n".format
+
+
+def _cell(value: Any) -> str:
+    # Pipes and newlines would break the table layout
+    return str(value).replace("|", "\\|").replace("\n", " ")
 
 
 class MarkdownRenderer:
     """Render analysis results as Markdown."""
 
+    def write_table(self, data: Iterable[Mapping[str, Any]], sink: TextIO, limit: Optional[int] = None) -> int:
+        """Stream a Markdown table to ``sink``.
+
+        Parameters
+        ----------
+        data: Iterable[Mapping[str, Any]]
+            Enriched indicator dictionaries.
+        sink: TextIO
+            File‑like object receiving the table.
+        limit: int, optional
+            Maximum number of rows to write.
+
+        Returns
+        -------
+        int
+            The number of rows written.
+        """
+        sink.write(_HEADER_BLOCK)
+        write = sink.write
+        rows = 0
+        for item in data:
+            if limit is not None and rows >= limit:
+                break
+            write(_ROW_TEMPLATE(*(_cell(item.get(f, "")) for f in _FIELDS)))
+            rows += 1
+        return rows
+
     def render_table(self, data: Iterable[Mapping[str, Any]]) -> str:
         """Return a Markdown table summarising the indicators.
 
@@ -25,10 +74,57 @@ class MarkdownRenderer:
         str
             A string containing a Markdown table.
         """
-        headers = ["Indicator", "Type", "Source", "Confidence"]
-        lines = ["| " + " | ".join(headers) + " |", "| " + " | ".join(["---"] * len(headers)) + " |"]
-        for item in data:
-            lines.append(
-                f"| {item.get('indicator', '')} | {item.get('type', '')} | {item.get('source', '')} | {item.get('confidence', '')} |"
-            )
-        return "\n".join(lines)
+        buffer = io.StringIO()
+        self.write_table(data, buffer)
+        return buffer.getvalue().rstrip("\n")
+
+    def iter_pages(self, data: Iterable[Mapping[str, Any]], page_size: int = 1000) -> Iterator[str]:
+        """Yield the table as pages of at most ``page_size`` rows, each with its own header."""
+        iterator = iter(data)
+        while True:
+            buffer = io.StringIO()
+            if not self.write_table(iterator, buffer, limit=page_size):
+                return
+            yield buffer.getvalue()
+
+    def write_split(
+        self, data: Iterable[Mapping[str, Any]], directory: Path, basename: str = "indicators", rows_per_file: int = 10000
+    ) -> List[Path]:
+        """Write the table across numbered files of at most ``rows_per_file`` rows.
+
+        Returns
+        -------
+        List[Path]
+            Paths of the files written, in order.
+        """
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        iterator = iter(data)
+        paths: List[Path] = []
+        while True:
+            path = directory / f"{basename}_{len(paths) + 1:04d}.md"
+            with path.open("w") as sink:
+                rows = self.write_table(iterator, sink, limit=rows_per_file)
+            if not rows:
+                path.unlink()
+                return paths
+            paths.append(path)
+
+    def write_summary(self, data: Iterable[Mapping[str, Any]], sink: TextIO, top_n: int = 10) -> IndicatorSummary:
+        """Stream a grouped overview with the top‑N indicators to ``sink``."""
+        summary = IndicatorSummary(top_n).update(data)
+        sink.write(f"**Indicators:** {summary.total}\n\n")
+        for title, counts in (("Type", summary.by_type), ("Source", summary.by_source)):
+            sink.write(f"| {title} | Count |\n| --- | --- |\n")
+            for key, count in counts.most_common():
+                sink.write(f"| {_cell(key)} | {count} |\n")
+            sink.write("\n")
+        sink.write(f"**Top {min(top_n, summary.total)} by confidence**\n\n")
+        self.write_table(summary.top(), sink)
+        return summary
+
+    def render_summary(self, data: Iterable[Mapping[str, Any]], top_n: int = 10) -> str:
+        """Return the output of :meth:`write_summary` as a string."""
+        buffer = io.StringIO()
+        self.write_summary(data, buffer, top_n)
+        return buffer.getvalue()
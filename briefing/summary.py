@@ -0,0 +1,136 @@
+"""
+Single‑pass summaries of indicator sets.
+
+Renderers and briefings used to list every indicator, which produces
+huge and unreadable output for large runs.  :class:`IndicatorSummary`
+consumes indicators one at a time and keeps only aggregate counts plus
+a bounded min‑heap of the top‑N indicators by confidence, so memory
+stays constant regardless of input size.  It also computes an
+order‑independent fingerprint over every field a briefing renders,
+which the executive briefing uses as a cache key.
+
+Items annotated by the campaign analyzer are additionally grouped per
+``campaign_id``; only per‑campaign counters are kept, so memory grows
+with the number of campaigns rather than indicators.  The IDs on items
+are provisional; pass the report's ``campaigns`` mapping to group them
+under their final campaign and size (IDs it does not list are final).
+"""
+
+import hashlib
+import heapq
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+
+#: Numeric equivalents for textual confidence values.
+CONFIDENCE_LEVELS = {"low": 0.3, "medium": 0.6, "high": 0.9}
+
+_MASK = (1 << 128) - 1
+
+
+class CampaignStats:
+    """Aggregate view of one campaign within a summary."""
+
+    __slots__ = ("campaign_id", "observed", "size", "types", "tags", "example")
+
+    def __init__(self, campaign_id: str):
+        self.campaign_id = campaign_id
+        self.observed = 0
+        self.size = 0
+        self.types: Counter = Counter()
+        self.tags: Counter = Counter()
+        self.example: Any = None
+
+    def add(self, item: Mapping[str, Any], size: int) -> None:
+        self.observed += 1
+        self.size = max(self.size, size)
+        self.types[item.get("type", "unknown")] += 1
+        self.tags.update(item.get("tags") or ())
+        indicator = item.get("indicator")
+        # The smallest indicator keeps the example independent of input order
+        if indicator is not None and (self.example is None or str(indicator) < str(self.example)):
+            self.example = indicator
+
+
+def confidence_value(value: Any) -> float:
+    """Return a sortable numeric confidence for numeric or textual values."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    return CONFIDENCE_LEVELS.get(str(value).lower(), 0.0)
+
+
+class IndicatorSummary:
+    """Aggregate counts and top‑N indicators in one pass.
+
+    Parameters
+    ----------
+    top_n: int
+        Number of highest‑confidence indicators to retain.
+    campaigns: Mapping[str, Mapping[str, Any]], optional
+        Final ``campaign_id``/``campaign_size`` per provisional campaign
+        ID, as returned by ``CampaignClusterAnalyzer.close_run``.
+    """
+
+    def __init__(self, top_n: int = 10, campaigns: Optional[Mapping[str, Mapping[str, Any]]] = None):
+        self.top_n = top_n
+        self.campaign_map = campaigns or {}
+        self.total = 0
+        self.by_type: Counter = Counter()
+        self.by_source: Counter = Counter()
+        self.by_compliance: Counter = Counter()
+        self.campaigns: Dict[str, CampaignStats] = {}
+        self._heap: List[Tuple[float, str, int, Mapping[str, Any]]] = []
+        self._digest = 0
+
+    def add(self, item: Mapping[str, Any]) -> None:
+        self.total += 1
+        self.by_type[item.get("type", "unknown")] += 1
+        self.by_source[item.get("source", "unknown")] += 1
+        regulations = [entry.get("regulation", "?") if isinstance(entry, Mapping) else str(entry)
+                       for entry in item.get("compliance") or ()]
+        self.by_compliance.update(regulations)
+        campaign_id = item.get("campaign_id")
+        campaign_size = int(item.get("campaign_size") or 0)
+        final = self.campaign_map.get(campaign_id) if campaign_id else None
+        if final:
+            campaign_id = final.get("campaign_id", campaign_id)
+            campaign_size = int(final.get("campaign_size") or campaign_size)
+        if campaign_id and campaign_size > 1:
+            stats = self.campaigns.get(campaign_id)
+            if stats is None:
+                stats = self.campaigns[campaign_id] = CampaignStats(campaign_id)
+            stats.add(item, campaign_size)
+        score = confidence_value(item.get("confidence"))
+        # Ties are broken on the indicator so the top list does not depend on
+        # input order; the running counter ensures dicts are never compared
+        entry = (score, str(item.get("indicator")), -self.total, item)
+        if len(self._heap) < self.top_n:
+            heapq.heappush(self._heap, entry)
+        elif entry > self._heap[0]:
+            heapq.heapreplace(self._heap, entry)
+        # Every field that ends up in a briefing is part of the fingerprint
+        key = "\x1f".join(map(str, (
+            item.get("indicator"), item.get("type", "unknown"), item.get("source", "unknown"),
+            item.get("confidence"), sorted(regulations), sorted(map(str, item.get("tags") or ())),
+            campaign_id, campaign_size,
+        ))).encode()
+        # Summing per-item digests makes the fingerprint independent of order
+        self._digest = (self._digest + int.from_bytes(hashlib.blake2b(key, digest_size=16).digest(), "big")) & _MASK
+
+    def update(self, data: Iterable[Mapping[str, Any]]) -> "IndicatorSummary":
+        for item in data:
+            self.add(item)
+        return self
+
+    def top(self) -> List[Mapping[str, Any]]:
+        """Return the retained indicators, highest confidence first."""
+        return [entry[-1] for entry in sorted(self._heap, reverse=True)]
+
+    def top_campaigns(self, n: int) -> List[CampaignStats]:
+        """Return the ``n`` campaigns with the most indicators observed in this set."""
+        return heapq.nlargest(n, self.campaigns.values(), key=lambda c: (c.observed, c.size, c.campaign_id))
+
+    @property
+    def fingerprint(self) -> str:
+        """Order‑independent digest of the indicator set."""
+        return f"{self.total:x}-{self._digest:032x}"
@@ -34,3 +34,8 @@ class BaseCollector(ABC):
             The combined indicators from each source.
         """
         raise NotImplementedError
+
+    def commit(self) -> None:
+        """Commit the read positions of all sources once a run has been persisted."""
+        for source in self.sources:
+            source.commit()
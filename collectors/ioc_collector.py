@@ -6,19 +6,38 @@ Each source must implement a :meth:`fetch` method returning an
 iterable of indicators.  Duplicate indicators are removed based on
 their ``indicator`` key.  Additional normalization and enrichment
 could be performed here.
+
+Per‑source fetch latency, item counts, errors, timeouts and the dedup
+hit ratio are recorded in :mod:`tdc_cyberintelligence.metrics`.
+*Observers* see every fetched item before deduplication, so per‑source
+volumes (e.g. for :class:`~tdc_cyberintelligence.analyzers.anomaly_analyzer.AnomalyAnalyzer`)
+do not depend on which source happened to deliver an indicator first.
 """
 
-from typing import Iterable, Mapping, Any, Sequence, Dict
+import time
+from typing import Any, Callable, Iterable, Iterator, List, Mapping, Sequence, Set
 
 from .base_collector import BaseCollector
 from ..sources.base_source import BaseSource
+from .. import metrics
 
 
 class IOCCollector(BaseCollector):
-    """Combine IOCs from multiple sources."""
+    """Combine IOCs from multiple sources.
+
+    Parameters
+    ----------
+    sources: Sequence[BaseSource]
+        Sources to fetch from, in priority order for deduplication.
+    observers: Sequence[Callable[[Mapping[str, Any]], None]]
+        Called with every fetched indicator, duplicates included.
+    """
 
-    def __init__(self, sources: Sequence[BaseSource]):
+    def __init__(
+        self, sources: Sequence[BaseSource], observers: Sequence[Callable[[Mapping[str, Any]], None]] = ()
+    ):
         super().__init__(sources)
+        self.observers = list(observers)
 
     def collect(self) -> Iterable[Mapping[str, Any]]:
         """Fetch and deduplicate IOCs from each source.
@@ -28,17 +47,75 @@ class IOCCollector(BaseCollector):
         Iterable[Mapping[str, Any]]
             A list of unique indicator dictionaries.
         """
-        seen: Dict[str, Mapping[str, Any]] = {}
+        return [item for batch in self.iter_batches() for item in batch]
+
+    def _observed(self, items: Iterable[Mapping[str, Any]]) -> Iterator[Mapping[str, Any]]:
+        """Pass ``items`` through, showing every indicator to the observers."""
+        observers = self.observers
+        if not observers:
+            yield from items
+            return
+        for item in items:
+            if item.get("indicator") is not None:
+                for observe in observers:
+                    observe(item)
+            yield item
+
+    def iter_batches(self, batch_size: int = 500) -> Iterator[List[Mapping[str, Any]]]:
+        """Yield unique indicators in batches as they are fetched.
+
+        Sources are consumed lazily, so a consumer that stops pulling
+        batches also stops the underlying fetch (backpressure).
+
+        Parameters
+        ----------
+        batch_size: int
+            Maximum number of indicators per batch.
+
+        Returns
+        -------
+        Iterator[List[Mapping[str, Any]]]
+            Lists of indicator dictionaries; only the first occurrence of
+            each ``indicator`` value is emitted.
+        """
+        seen: Set[str] = set()
+        batch: List[Mapping[str, Any]] = []
+        fetched = 0
+        duplicates = 0
         for source in self.sources:
+            source_name = getattr(source, "name", type(source).__name__)
+            count = 0
+            start = time.perf_counter()
+            # Time spent blocked on downstream consumers is not fetch latency
+            blocked = 0.0
             try:
-                for item in source.fetch():
-                    indicator = item.get("indicator")
-                    if indicator is None:
-                        continue
-                    # Only keep the first occurrence
-                    if indicator not in seen:
-                        seen[indicator] = item
+                with metrics.span("collect.fetch", source=source_name):
+                    for item in self._observed(source.fetch()):
+                        count += 1
+                        indicator = item.get("indicator")
+                        if indicator is None:
+                            continue
+                        # Only keep the first occurrence
+                        if indicator in seen:
+                            duplicates += 1
+                            continue
+                        seen.add(indicator)
+                        batch.append(item)
+                        if len(batch) >= batch_size:
+                            yielded_at = time.perf_counter()
+                            yield batch
+                            blocked += time.perf_counter() - yielded_at
+                            batch = []
             except Exception as exc:
                 # In a real implementation you may log the error or send a notification.
-                continue
-        return list(seen.values())
+                metrics.SOURCE_ERRORS.inc(source=source_name)
+                if metrics.is_timeout(exc):
+                    metrics.SOURCE_TIMEOUTS.inc(source=source_name)
+            finally:
+                metrics.SOURCE_FETCH_SECONDS.observe(time.perf_counter() - start - blocked, source=source_name)
+                metrics.SOURCE_ITEMS.inc(count, source=source_name)
+                fetched += count
+        if batch:
+            yield batch
+        metrics.DEDUP_HITS.inc(duplicates)
+        metrics.DEDUP_RATIO.set(duplicates / fetched if fetched else 0.0)
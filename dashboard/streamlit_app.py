@@ -27,11 +27,14 @@ def load_intel_docs(folder: Path):
         Parsed JSON documents.
     """
     docs = []
-    for json_file in folder.glob("*.json"):
+    for json_file in folder.glob("intel_report_*.json"):
         try:
-            docs.append(json.loads(json_file.read_text()))
+            doc = json.loads(json_file.read_text())
         except Exception:
             continue
+        # Only intel reports are shown; other JSON artefacts have a different shape
+        if isinstance(doc, dict):
+            docs.append(doc)
     return docs
 
 
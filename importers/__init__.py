@@ -0,0 +1 @@
+"""Offline importers for backfilling indicators from bulk exports."""
@@ -0,0 +1,267 @@
+"""
+Lightweight instrumentation for the collection and analysis pipeline.
+
+This module provides a small in‑process metrics registry with
+counters, gauges and histograms that can be rendered in the Prometheus
+text exposition format.  It deliberately avoids a hard dependency on
+``prometheus_client`` so the skeleton runs anywhere; the FastAPI app
+exposes the registry via ``GET /metrics``.
+
+Optional tracing spans are emitted through OpenTelemetry when the
+``opentelemetry-api`` package is installed and ``TRACING_ENABLED`` is
+set.  Otherwise :func:`span` is a no‑op context manager.
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+try:
+    from opentelemetry import trace  # type: ignore
+except ImportError:
+    trace = None  # type: ignore
+
+
+#: Default histogram buckets in seconds, suitable for network fetches and flushes.
+DEFAULT_BUCKETS: Tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Mapping[str, Any]) -> LabelKey:
+    return tuple(sorted((str(k), str(v)) for k, v in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(key)
+    if extra is not None:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+class _Metric:
+    """Common state for a named metric family."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, description: str):
+        self.name = name
+        self.description = description
+        self._lock = threading.Lock()
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return lines
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonically increasing counter."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, description: str):
+        super().__init__(name, description)
+        self._values: Dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: Any) -> float:
+        return self._values.get(_label_key(labels), 0.0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            return [f"{self.name}{_format_labels(k)} {v}" for k, v in self._values.items()]
+
+
+class Gauge(_Metric):
+    """Value that can go up and down (e.g. queue depth)."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, description: str):
+        super().__init__(name, description)
+        self._values: Dict[LabelKey, float] = {}
+
+    def set(self, value: float, **labels: Any) -> None:
+        with self._lock:
+            self._values[_label_key(labels)] = float(value)
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: Any) -> None:
+        self.inc(-amount, **labels)
+
+    def value(self, **labels: Any) -> float:
+        return self._values.get(_label_key(labels), 0.0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            return [f"{self.name}{_format_labels(k)} {v}" for k, v in self._values.items()]
+
+
+class Histogram(_Metric):
+    """Cumulative histogram of observed values."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, description: str, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, description)
+        self.buckets = tuple(sorted(buckets))
+        # label key -> [bucket counts..., sum, count]
+        self._values: Dict[LabelKey, List[float]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = [0.0] * (len(self.buckets) + 2)
+                self._values[key] = state
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    @contextmanager
+    def time(self, **labels: Any) -> Iterator[None]:
+        """Observe the wall‑clock duration of the ``with`` block."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels: Any) -> float:
+        state = self._values.get(_label_key(labels))
+        return state[-1] if state else 0.0
+
+    def sum(self, **labels: Any) -> float:
+        state = self._values.get(_label_key(labels))
+        return state[-2] if state else 0.0
+
+    def _samples(self) -> List[str]:
+        lines: List[str] = []
+        with self._lock:
+            for key, state in self._values.items():
+                for bound, cumulative in zip(self.buckets, state):
+                    lines.append(f"{self.name}_bucket{_format_labels(key, ('le', repr(float(bound))))} {cumulative}")
+                lines.append(f"{self.name}_bucket{_format_labels(key, ('le', '+Inf'))} {state[-1]}")
+                lines.append(f"{self.name}_sum{_format_labels(key)} {state[-2]}")
+                lines.append(f"{self.name}_count{_format_labels(key)} {state[-1]}")
+        return lines
+
+
+class MetricsRegistry:
+    """Container for metric families, rendered together for scraping."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> Any:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric):
+                    raise ValueError(f"Metric {metric.name} already registered as {existing.kind}")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, description: str) -> Counter:
+        return self._register(Counter(name, description))
+
+    def gauge(self, name: str, description: str) -> Gauge:
+        return self._register(Gauge(name, description))
+
+    def histogram(self, name: str, description: str, buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, description, buckets))
+
+    def render(self) -> str:
+        """Return all metrics in the Prometheus text exposition format."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+#: Process‑wide registry used by the pipeline and served on ``/metrics``.
+REGISTRY = MetricsRegistry()
+
+#: Content type expected by Prometheus scrapers.
+CONTENT_TYPE_LATEST = "text/plain; version=0.0.4; charset=utf-8"
+
+SOURCE_FETCH_SECONDS = REGISTRY.histogram(
+    "tdc_source_fetch_seconds", "Time spent fetching indicators from a source."
+)
+SOURCE_ITEMS = REGISTRY.counter("tdc_source_items_total", "Indicators returned by a source.")
+SOURCE_ERRORS = REGISTRY.counter("tdc_source_errors_total", "Source fetches that raised an exception.")
+SOURCE_TIMEOUTS = REGISTRY.counter("tdc_source_timeouts_total", "Source fetches that timed out.")
+DEDUP_HITS = REGISTRY.counter("tdc_collector_dedup_hits_total", "Indicators dropped as duplicates.")
+DEDUP_RATIO = REGISTRY.gauge(
+    "tdc_collector_dedup_ratio", "Fraction of fetched indicators dropped as duplicates in the last cycle."
+)
+ANALYZER_ITEMS = REGISTRY.counter("tdc_analyzer_items_total", "Indicators processed by an analyzer.")
+ANALYZER_SECONDS = REGISTRY.histogram(
+    "tdc_analyzer_seconds", "Time spent inside an analyzer per pipeline run."
+)
+BIGQUERY_FLUSH_SECONDS = REGISTRY.histogram(
+    "tdc_bigquery_flush_seconds", "Latency of BigQuery insert calls."
+)
+BIGQUERY_ROWS = REGISTRY.counter("tdc_bigquery_rows_total", "Rows submitted to BigQuery.")
+QUEUE_DEPTH = REGISTRY.gauge("tdc_pipeline_queue_depth", "Batches buffered in a pipeline queue.")
+QUEUE_CAPACITY = REGISTRY.gauge("tdc_pipeline_queue_capacity", "Maximum in-memory batches of a pipeline queue.")
+QUEUE_BLOCKED_SECONDS = REGISTRY.counter(
+    "tdc_pipeline_queue_blocked_seconds_total", "Time producers spent blocked on a full queue."
+)
+QUEUE_DROPPED = REGISTRY.counter("tdc_pipeline_dropped_items_total", "Indicators dropped because a queue was full.")
+QUEUE_SPILLED = REGISTRY.counter("tdc_pipeline_spilled_items_total", "Indicators spilled to disk because a queue was full.")
+ANOMALIES = REGISTRY.counter("tdc_anomalies_total", "Volume anomalies (spike/silence) detected per run.")
+PIPELINE_RUN_SECONDS = REGISTRY.histogram(
+    "tdc_pipeline_run_seconds", "End‑to‑end duration of a collect‑and‑analyze cycle."
+)
+
+
+def is_timeout(exc: BaseException) -> bool:
+    """Return ``True`` if *exc* represents a timeout.
+
+    ``requests`` timeouts do not subclass :class:`TimeoutError`, so the
+    class hierarchy is inspected by name to avoid importing it here.
+    """
+    if isinstance(exc, TimeoutError):
+        return True
+    return any("Timeout" in cls.__name__ for cls in type(exc).__mro__)
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[None]:
+    """Open a tracing span if OpenTelemetry is available and enabled."""
+    if trace is None or not os.environ.get("TRACING_ENABLED"):
+        yield
+        return
+    tracer = trace.get_tracer("tdc_cyberintelligence")
+    with tracer.start_as_current_span(name) as current:
+        for key, value in attributes.items():
+            current.set_attribute(key, value)
+        yield
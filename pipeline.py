@@ -0,0 +1,326 @@
+"""
+Backpressure‑aware pipeline connecting collectors, analyzers and sinks.
+
+Previously each stage materialised its full output in a list before the
+next stage started, so a slow sink (BigQuery, disk) behind fast sources
+meant buffering everything in memory.  :class:`Pipeline` instead runs
+every stage on its own thread and connects them with
+:class:`BoundedQueue` instances holding at most ``queue_size`` batches.
+When a consumer lags, producers block on ``put`` and, because sources
+are consumed lazily through :meth:`IOCCollector.iter_batches`, fetching
+slows down too.
+
+For overload situations where blocking is undesirable a queue can
+instead ``drop`` new batches or ``spill`` them to a JSON‑lines file on
+disk, which is drained once the in‑memory queue empties.  Spilled
+items are round‑tripped through JSON, so non‑JSON values such as
+``datetime`` come back as strings.  Queue occupancy, blocked time and
+dropped/spilled counts are exported via :mod:`~tdc_cyberintelligence.metrics`.
+"""
+
+import inspect
+import json
+import os
+import queue
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Sequence
+
+from . import metrics
+from .analyzers.base_analyzer import BaseAnalyzer
+from .collectors.ioc_collector import IOCCollector
+from .profiling import NullProfiler
+
+
+Batch = List[Mapping[str, Any]]
+Sink = Callable[[Batch], None]
+
+#: Overflow policies understood by :class:`BoundedQueue`.
+OVERFLOW_POLICIES = ("block", "drop", "spill")
+
+_END = object()
+
+
+class PipelineAborted(RuntimeError):
+    """Raised inside a stage when another stage has failed."""
+
+
+class BoundedQueue:
+    """Queue of batches with a fixed capacity and an overflow policy.
+
+    Parameters
+    ----------
+    name: str
+        Label used for metrics.
+    maxsize: int
+        Maximum number of batches held in memory.
+    overflow: str
+        ``block`` (apply backpressure), ``drop`` or ``spill``.
+    spill_dir: str, optional
+        Directory for spill files (defaults to the system temp dir).
+    abort: threading.Event, optional
+        Set by the pipeline to release blocked producers after a failure.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        maxsize: int = 8,
+        overflow: str = "block",
+        spill_dir: Optional[str] = None,
+        abort: Optional[threading.Event] = None,
+    ):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {overflow}")
+        self.name = name
+        self.overflow = overflow
+        self.spill_dir = spill_dir
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize)
+        self._abort = abort or threading.Event()
+        self._spill_lock = threading.Lock()
+        self._spill_path: Optional[str] = None
+        self._spill_writer = None
+        self._spill_reader = None
+        self._spilled_batches = 0
+        metrics.QUEUE_CAPACITY.set(maxsize, queue=name)
+
+    def _update_gauge(self) -> None:
+        metrics.QUEUE_DEPTH.set(self._queue.qsize() + self._spilled_batches, queue=self.name)
+
+    def _put_blocking(self, item: Any) -> None:
+        start = time.perf_counter()
+        while True:
+            if self._abort.is_set():
+                raise PipelineAborted(self.name)
+            try:
+                self._queue.put(item, timeout=0.1)
+                break
+            except queue.Full:
+                continue
+        waited = time.perf_counter() - start
+        if waited > 0.001:
+            metrics.QUEUE_BLOCKED_SECONDS.inc(waited, queue=self.name)
+
+    def put(self, batch: Batch) -> None:
+        """Add a batch, applying the configured overflow policy when full."""
+        if self.overflow == "block":
+            self._put_blocking(batch)
+        else:
+            try:
+                self._queue.put_nowait(batch)
+            except queue.Full:
+                if self.overflow == "drop":
+                    metrics.QUEUE_DROPPED.inc(len(batch), queue=self.name)
+                else:
+                    self._spill(batch)
+        self._update_gauge()
+
+    def close(self) -> None:
+        """Signal that no more batches will be added."""
+        # The end marker must never be dropped or spilled
+        self._put_blocking(_END)
+
+    def _spill(self, batch: Batch) -> None:
+        with self._spill_lock:
+            if self._spill_writer is None:
+                fd, self._spill_path = tempfile.mkstemp(prefix=f"spill_{self.name}_", suffix=".jsonl", dir=self.spill_dir)
+                self._spill_writer = os.fdopen(fd, "w")
+                self._spill_reader = open(self._spill_path, "r")
+            self._spill_writer.write(json.dumps(batch, default=str) + "\n")
+            self._spill_writer.flush()
+            self._spilled_batches += 1
+        metrics.QUEUE_SPILLED.inc(len(batch), queue=self.name)
+
+    def _unspill(self) -> Optional[Batch]:
+        with self._spill_lock:
+            if not self._spilled_batches:
+                return None
+            line = self._spill_reader.readline()
+            self._spilled_batches -= 1
+        return json.loads(line)
+
+    def __iter__(self) -> Iterator[Batch]:
+        closed = False
+        while True:
+            if self._abort.is_set():
+                return
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                # Spilled batches are drained as soon as memory is empty
+                item = self._unspill()
+                if item is None:
+                    if closed:
+                        self._update_gauge()
+                        self._cleanup()
+                        return
+                    # Nothing buffered anywhere: wait for the producer
+                    try:
+                        item = self._queue.get(timeout=0.1)
+                    except queue.Empty:
+                        continue
+            if item is _END:
+                closed = True
+                continue
+            self._update_gauge()
+            yield item
+
+    def _cleanup(self) -> None:
+        with self._spill_lock:
+            for handle in (self._spill_writer, self._spill_reader):
+                if handle is not None:
+                    handle.close()
+            if self._spill_path and os.path.exists(self._spill_path):
+                os.unlink(self._spill_path)
+            self._spill_writer = self._spill_reader = self._spill_path = None
+
+
+class Pipeline:
+    """Run collector → analyzers → sinks as concurrent stages.
+
+    Parameters
+    ----------
+    collector: IOCCollector
+        Source of indicator batches.
+    analyzers: Sequence[BaseAnalyzer]
+        Applied in order to every batch.
+    sinks: Sequence[Callable[[List[Mapping]], None]]
+        Called with every fully analysed batch, in order.
+    batch_size: int
+        Number of indicators per batch.
+    queue_size: int
+        Capacity of each inter‑stage queue, in batches.
+    overflow: str
+        Overflow policy for the queues (see :data:`OVERFLOW_POLICIES`).
+    spill_dir: str, optional
+        Directory used by the ``spill`` policy.
+    profiler: RunProfiler, optional
+        Receives per‑stage CPU profiles and allocation summaries from
+        the worker threads.
+    """
+
+    def __init__(
+        self,
+        collector: IOCCollector,
+        analyzers: Sequence[BaseAnalyzer],
+        sinks: Sequence[Sink],
+        batch_size: int = 500,
+        queue_size: int = 8,
+        overflow: str = "block",
+        spill_dir: Optional[str] = None,
+        profiler: Any = None,
+    ):
+        self.collector = collector
+        self.analyzers = list(analyzers)
+        self.sinks = list(sinks)
+        self.batch_size = batch_size
+        self.queue_size = queue_size
+        self.overflow = overflow
+        self.spill_dir = spill_dir
+        self.profiler = profiler or NullProfiler()
+        self.stats: Dict[str, int] = {}
+
+    def run(self) -> Dict[str, int]:
+        """Run the pipeline to completion and return item counts per stage.
+
+        The first exception raised by any stage aborts the others and is
+        re‑raised here.
+        """
+        abort = threading.Event()
+        errors: List[BaseException] = []
+        names = ["collect"] + [type(a).__name__ for a in self.analyzers]
+        queues = [BoundedQueue(name, self.queue_size, self.overflow, self.spill_dir, abort) for name in names]
+        self.stats = {name: 0 for name in names}
+        self.stats["sink"] = 0
+
+        def guarded(func: Callable[[], None]) -> Callable[[], None]:
+            def runner() -> None:
+                try:
+                    func()
+                except PipelineAborted:
+                    pass
+                except BaseException as exc:
+                    errors.append(exc)
+                    abort.set()
+            return runner
+
+        def produce() -> None:
+            out = queues[0]
+            with self.profiler.thread_stage("collect", _source_files(self.collector)):
+                for batch in self.collector.iter_batches(self.batch_size):
+                    self.stats["collect"] += len(batch)
+                    out.put(batch)
+            out.close()
+
+        def analyze(index: int) -> Callable[[], None]:
+            analyzer = self.analyzers[index]
+            name = names[index + 1]
+
+            def stage() -> None:
+                source, out = queues[index], queues[index + 1]
+                with self.profiler.thread_stage(name, _source_files(analyzer)):
+                    for batch in source:
+                        with metrics.span(f"analyze.{name}", items=len(batch)), metrics.ANALYZER_SECONDS.time(analyzer=name):
+                            result = list(analyzer.analyze(batch))
+                        metrics.ANALYZER_ITEMS.inc(len(result), analyzer=name)
+                        self.stats[name] += len(result)
+                        out.put(result)
+                out.close()
+            return stage
+
+        def consume() -> None:
+            with self.profiler.thread_stage("sink", [f for sink in self.sinks for f in _source_files(sink)]):
+                for batch in queues[-1]:
+                    for sink in self.sinks:
+                        sink(batch)
+                    self.stats["sink"] += len(batch)
+
+        threads = [threading.Thread(target=guarded(produce), name="pipeline-collect", daemon=True)]
+        threads += [
+            threading.Thread(target=guarded(analyze(i)), name=f"pipeline-{names[i + 1]}", daemon=True)
+            for i in range(len(self.analyzers))
+        ]
+        threads.append(threading.Thread(target=guarded(consume), name="pipeline-sink", daemon=True))
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for q in queues:
+            q._cleanup()
+        if errors:
+            raise errors[0]
+        return self.stats
+
+
+def _source_files(obj: Any) -> List[str]:
+    """Return the source file defining ``obj`` (or its class) for allocation attribution."""
+    target = obj if inspect.isfunction(obj) or inspect.ismethod(obj) else type(obj)
+    try:
+        path = inspect.getsourcefile(target)
+    except TypeError:
+        return []
+    return [path] if path else []
+
+
+def pipeline_from_env(
+    collector: IOCCollector,
+    analyzers: Sequence[BaseAnalyzer],
+    sinks: Sequence[Sink],
+    profiler: Any = None,
+) -> Pipeline:
+    """Build a :class:`Pipeline` tuned by ``PIPELINE_*`` environment variables.
+
+    ``PIPELINE_BATCH_SIZE``, ``PIPELINE_QUEUE_SIZE``, ``PIPELINE_OVERFLOW``
+    and ``PIPELINE_SPILL_DIR`` map to the constructor arguments.
+    """
+    return Pipeline(
+        collector,
+        analyzers,
+        sinks,
+        batch_size=int(os.environ.get("PIPELINE_BATCH_SIZE", "500")),
+        queue_size=int(os.environ.get("PIPELINE_QUEUE_SIZE", "8")),
+        overflow=os.environ.get("PIPELINE_OVERFLOW", "block"),
+        spill_dir=os.environ.get("PIPELINE_SPILL_DIR") or None,
+        profiler=profiler,
+    )
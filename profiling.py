@@ -0,0 +1,265 @@
+"""
+Opt‑in profiling for slow collection runs.
+
+When enabled, a run is wrapped in :mod:`cProfile` plus a lightweight
+stack sampler covering all threads, and :mod:`tracemalloc` snapshots
+are taken around every stage.  Pipeline stages run on worker threads,
+so :class:`~tdc_cyberintelligence.pipeline.Pipeline` reports them via
+:meth:`RunProfiler.thread_stage`, which profiles the worker thread and
+attributes allocations to the stage by the code files in their
+tracebacks.  Snapshots are taken with cProfile paused and only diffed
+in :meth:`RunProfiler.write`, after tracing has stopped, so the profile
+measures the run rather than the profiler.  After the run the following files
+are written next to the intel report:
+
+* ``<report>.pstats`` – cProfile statistics (open with ``snakeviz`` or ``pstats``).
+* ``<report>.folded`` – collapsed stacks for ``flamegraph.pl``/speedscope.
+* ``<report>.alloc.txt`` – top allocation sites per stage.
+
+Profiling is enabled with the ``PROFILE_RUNS`` environment variable or
+the ``profile`` query parameter of ``POST /collect-and-analyze``.  When
+disabled, :func:`get_profiler` returns a shared no‑op object so the
+instrumented code paths cost nothing beyond a method call.
+"""
+
+import cProfile
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import ContextManager, Iterator, List, Optional, Sequence, Tuple
+
+
+#: Environment variable that turns on profiling for every run.
+PROFILE_ENV_VAR = "PROFILE_RUNS"
+
+_TRUTHY = {"1", "true", "yes", "on"}
+
+#: Suffixes of the files :meth:`RunProfiler.write` leaves next to a report.
+ARTEFACT_SUFFIXES = (".pstats", ".folded", ".alloc.txt")
+
+# tracemalloc is process-wide; concurrent profiled runs share it and the
+# last one to finish stops it (unless it was already running beforehand).
+_TRACEMALLOC_LOCK = threading.Lock()
+_tracemalloc_users = 0
+_tracemalloc_owned = False
+
+
+def _acquire_tracemalloc() -> None:
+    global _tracemalloc_users, _tracemalloc_owned
+    with _TRACEMALLOC_LOCK:
+        if _tracemalloc_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start(25)
+            _tracemalloc_owned = True
+        _tracemalloc_users += 1
+
+
+def _release_tracemalloc() -> None:
+    global _tracemalloc_users, _tracemalloc_owned
+    with _TRACEMALLOC_LOCK:
+        _tracemalloc_users -= 1
+        if _tracemalloc_users == 0 and _tracemalloc_owned:
+            tracemalloc.stop()
+            _tracemalloc_owned = False
+
+
+def profiling_requested(flag: Optional[bool] = None) -> bool:
+    """Return ``True`` if profiling is requested explicitly or via the environment."""
+    if flag:
+        return True
+    return os.environ.get(PROFILE_ENV_VAR, "").strip().lower() in _TRUTHY
+
+
+class NullProfiler:
+    """Profiler stand‑in used when profiling is disabled."""
+
+    enabled = False
+
+    def __enter__(self) -> "NullProfiler":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        return None
+
+    def stage(self, name: str) -> ContextManager[None]:
+        return nullcontext()
+
+    def thread_stage(self, name: str, files: Sequence[str] = ()) -> ContextManager[None]:
+        return nullcontext()
+
+    def write(self, reports_dir: Path, basename: str) -> List[Path]:
+        return []
+
+
+_NULL_PROFILER = NullProfiler()
+
+
+class _StackSampler(threading.Thread):
+    """Periodically sample the stacks of all threads into collapsed form.
+
+    Pipeline stages run on worker threads, which :mod:`cProfile` does not
+    see, so every thread is sampled and its name used as the root frame.
+    """
+
+    def __init__(self, interval: float):
+        super().__init__(name="stack-sampler", daemon=True)
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        own_id = threading.get_ident()
+        while not self._stop_event.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{Path(code.co_filename).name}:{code.co_name}:{frame.f_lineno}")
+                    frame = frame.f_back
+                if stack:
+                    stack.append(names.get(thread_id, str(thread_id)))
+                    self.samples[";".join(reversed(stack))] += 1
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.join()
+
+
+class RunProfiler:
+    """Profile a single collect‑and‑analyze run.
+
+    Parameters
+    ----------
+    sample_interval: float
+        Seconds between stack samples for the folded output.
+    top_n: int
+        Number of allocation sites reported per stage.
+    """
+
+    enabled = True
+
+    def __init__(self, sample_interval: float = 0.005, top_n: int = 15):
+        self.sample_interval = sample_interval
+        self.top_n = top_n
+        self._profile = cProfile.Profile()
+        self._thread_profiles: List[cProfile.Profile] = []
+        self._sampler: Optional[_StackSampler] = None
+        # (name, elapsed, before, after, attribution files, traced peak)
+        self._captures: List[Tuple[str, float, Optional[tracemalloc.Snapshot], tracemalloc.Snapshot, Sequence[str], int]] = []
+        self._lock = threading.Lock()
+        self._last_snapshot: Optional[tracemalloc.Snapshot] = None
+
+    def __enter__(self) -> "RunProfiler":
+        _acquire_tracemalloc()
+        self._last_snapshot = tracemalloc.take_snapshot()
+        self._sampler = _StackSampler(self.sample_interval)
+        self._sampler.start()
+        self._profile.enable()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._profile.disable()
+        if self._sampler is not None:
+            self._sampler.stop()
+        _release_tracemalloc()
+
+    def _capture(self, name: str, elapsed: float, before: Optional[tracemalloc.Snapshot],
+                 files: Sequence[str] = ()) -> tracemalloc.Snapshot:
+        # Only the C-level snapshot is taken here; filtering and diffing are
+        # pure Python and many times slower while tracing, so they run in write()
+        snapshot = tracemalloc.take_snapshot()
+        with self._lock:
+            self._captures.append((name, elapsed, before, snapshot, files, tracemalloc.get_traced_memory()[1]))
+        return snapshot
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Record duration and allocation growth of a named stage on the calling thread."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self._profile.disable()
+            try:
+                self._last_snapshot = self._capture(name, elapsed, self._last_snapshot)
+            finally:
+                self._profile.enable()
+
+    @contextmanager
+    def thread_stage(self, name: str, files: Sequence[str] = ()) -> Iterator[None]:
+        """Profile a pipeline stage running on its own worker thread.
+
+        Parameters
+        ----------
+        name: str
+            Stage name used in the allocation summary.
+        files: Sequence[str]
+            Source files of the stage's code.  Only allocations whose
+            traceback passes through one of them are attributed to the
+            stage, which separates concurrently running stages.
+        """
+        before = self._last_snapshot
+        profile: Optional[cProfile.Profile] = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Interpreters with a process-wide profiler already cover this thread
+            profile = None
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            if profile is not None:
+                profile.disable()
+                with self._lock:
+                    self._thread_profiles.append(profile)
+            self._capture(name, elapsed, before, files)
+
+    def _allocation_report(self) -> List[str]:
+        lines: List[str] = []
+        for name, elapsed, before, after, files, peak in self._captures:
+            filters = [tracemalloc.Filter(False, tracemalloc.__file__)]
+            # Inclusive filters are OR'ed: keep traces passing through any stage file
+            filters += [tracemalloc.Filter(True, f, all_frames=True) for f in files]
+            after = after.filter_traces(filters)
+            stats = after.compare_to(before.filter_traces(filters), "lineno") if before is not None else []
+            lines.append(f"== {name}: {elapsed * 1000:.1f} ms, traced peak {peak / (1024 * 1024):.1f} MiB")
+            lines.extend(f"  {stat}" for stat in stats[: self.top_n])
+            lines.append("")
+        return lines
+
+    def write(self, reports_dir: Path, basename: str) -> List[Path]:
+        """Write profiling artefacts next to the report and return their paths."""
+        reports_dir.mkdir(parents=True, exist_ok=True)
+        pstats_path, folded_path, alloc_path = (reports_dir / f"{basename}{suffix}" for suffix in ARTEFACT_SUFFIXES)
+        stats = pstats.Stats(self._profile)
+        for profile in self._thread_profiles:
+            stats.add(profile)
+        stats.dump_stats(str(pstats_path))
+
+        samples = self._sampler.samples if self._sampler is not None else {}
+        folded_path.write_text("".join(f"{stack} {count}\n" for stack, count in samples.items()))
+
+        lines = self._allocation_report()
+        # Snapshots are large; release them once summarised
+        self._captures = []
+        self._last_snapshot = None
+        alloc_path.write_text("\n".join(lines))
+        return [pstats_path, folded_path, alloc_path]
+
+
+def get_profiler(flag: Optional[bool] = None):
+    """Return a :class:`RunProfiler` if profiling is requested, else a no‑op profiler."""
+    if profiling_requested(flag):
+        return RunProfiler()
+    return _NULL_PROFILER
@@ -0,0 +1,188 @@
+"""
+One collect‑and‑analyze run, shared by the API and the scheduler.
+
+:func:`run_collection` loads the source plugins, streams the collected
+indicators through the analyzers into the intel report, its NDJSON
+export and any extra sinks (BigQuery when ``BQ_PROJECT``,
+``BQ_DATASET`` and ``BQ_TABLE`` are set), and publishes the report.
+A run that fails part way removes its partial report and export files
+and leaves the source cursors where they were, so the next run fetches
+the same data again.
+"""
+
+import json
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, List, Optional, Sequence, Tuple
+
+from . import load_plugins
+from . import metrics
+from .analyzers.anomaly_analyzer import AnomalyAnalyzer
+from .analyzers.base_analyzer import BaseAnalyzer
+from .analyzers.campaign_analyzer import CampaignClusterAnalyzer
+from .analyzers.correlation_analyzer import CorrelationAnalyzer
+from .analyzers.regulatory_analyzer import RegulatoryAnalyzer
+from .analyzers.risk_scoring_analyzer import RiskScoringAnalyzer
+from .bigquery_writer import BigQueryWriter
+from .briefing.intel_reporter import IntelReporter
+from .collectors.ioc_collector import IOCCollector
+from .pipeline import Sink, pipeline_from_env
+from .profiling import get_profiler
+from .sources.base_source import BaseSource
+from .storage import export
+from .storage.locking import state_lock
+from .storage.retention import anomaly_report_path
+
+#: Environment variables holding the API key of each keyed source.
+SOURCE_KEYS = {"otx": "OTX_KEY", "shodan": "SHODAN_KEY", "hibp": "HIBP_KEY"}
+
+#: Sources configured through their own environment variables
+#: (``STIX_PATHS``/``TAXII_URL`` for STIX).
+UNKEYED_SOURCES = {"cfcs", "stix"}
+
+
+def sources_from_env() -> List[BaseSource]:
+    """Instantiate every source plugin that can be configured from the environment.
+
+    MISP is only enabled when ``MISP_URL`` is set (with ``MISP_KEY``);
+    plugins that fail to initialise are skipped.
+    """
+    instances = []
+    for src_cls in load_plugins():
+        if src_cls.name == "misp":
+            if not os.environ.get("MISP_URL"):
+                continue
+            kwargs = {"api_url": os.environ["MISP_URL"], "api_key": os.environ.get("MISP_KEY", "")}
+        elif src_cls.name in SOURCE_KEYS:
+            kwargs = {"api_key": os.environ.get(SOURCE_KEYS[src_cls.name], "")}
+        elif src_cls.name in UNKEYED_SOURCES:
+            kwargs = {}
+        else:
+            continue
+        try:
+            instances.append(src_cls(**kwargs))
+        except Exception:
+            continue
+    return instances
+
+
+def bigquery_sink_from_env() -> Optional[Sink]:
+    """Return a sink writing batches to BigQuery, or ``None`` if not configured.
+
+    BigQuery errors are swallowed so an unavailable warehouse never fails
+    the run; the report remains the system of record.
+    """
+    bq_project = os.environ.get("BQ_PROJECT")
+    bq_dataset = os.environ.get("BQ_DATASET")
+    bq_table = os.environ.get("BQ_TABLE")
+    if not (bq_project and bq_dataset and bq_table):
+        return None
+    try:
+        bq_writer = BigQueryWriter(bq_project, bq_dataset, bq_table)
+    except Exception:
+        return None
+
+    def write_bigquery(batch):
+        try:
+            bq_writer.write_indicators(batch)
+        except Exception:
+            pass
+
+    return write_bigquery
+
+
+def analyzer_state_paths(reports_dir: Path) -> Tuple[Path, Path]:
+    """Return the campaign state directory and anomaly state file of ``reports_dir``."""
+    campaign_dir = Path(os.environ.get("CAMPAIGN_STATE_DIR") or reports_dir / "store" / "campaigns")
+    anomaly_path = Path(os.environ.get("ANOMALY_STATE") or reports_dir / "store" / "anomaly_state.json")
+    return campaign_dir, anomaly_path
+
+
+def _stream_report(
+    partial: Path,
+    report_path: Path,
+    collector: IOCCollector,
+    analyzers: Sequence[BaseAnalyzer],
+    sinks: Sequence[Sink],
+    campaigns: CampaignClusterAnalyzer,
+    profiler: Any,
+) -> None:
+    writer = export.ExportWriter(export.export_path(report_path))
+    try:
+        with partial.open("w") as fh:
+            report = IntelReporter().open_stream(fh)
+            pipeline_from_env(collector, analyzers, [export.tee_encoded(report, writer), *sinks], profiler).run()
+            report.close({"campaigns": campaigns.close_run()})
+    except BaseException:
+        writer.abort()
+        raise
+    writer.close()
+
+
+def run_collection(
+    reports_dir: Path,
+    profiler: Any = None,
+    trigger: str = "api",
+    sources: Optional[Sequence[BaseSource]] = None,
+    sinks: Optional[Sequence[Sink]] = None,
+) -> Path:
+    """Collect, analyse and publish one intel report.
+
+    Parameters
+    ----------
+    reports_dir:
+        Directory receiving the report, its export and the analyzer state.
+    profiler:
+        Profiler from :func:`~tdc_cyberintelligence.profiling.get_profiler`;
+        the caller writes its artefacts.  Defaults to ``PROFILE_RUNS``.
+    trigger:
+        Label of the run in the ``tdc_pipeline_run_seconds`` metric.
+    sources, sinks:
+        Override :func:`sources_from_env` and :func:`bigquery_sink_from_env`.
+
+    Returns
+    -------
+    Path
+        The published report.  On failure nothing is published, the
+        partial files are removed and the exception propagates.
+    """
+    start = time.perf_counter()
+    profiler = profiler if profiler is not None else get_profiler()
+    reports_dir.mkdir(parents=True, exist_ok=True)
+    timestamp = datetime.utcnow().strftime("%Y%m%dT%H%M%SZ")
+    path = reports_dir / f"intel_report_{timestamp}.json"
+    partial = path.with_suffix(".json.partial")
+    with profiler:
+        if sources is None:
+            with profiler.stage("load_sources"):
+                sources = sources_from_env()
+        if sinks is None:
+            sinks = [sink for sink in (bigquery_sink_from_env(),) if sink is not None]
+        campaign_dir, anomaly_path = analyzer_state_paths(reports_dir)
+        # Runs sharing analyzer state take turns so none overwrites another's updates
+        with profiler.stage("pipeline"), state_lock(campaign_dir), state_lock(anomaly_path):
+            campaigns = CampaignClusterAnalyzer(campaign_dir)
+            anomalies = AnomalyAnalyzer(anomaly_path)
+            analyzers = [CorrelationAnalyzer(), RiskScoringAnalyzer(), RegulatoryAnalyzer(), campaigns, anomalies]
+            # Feed volumes are counted before deduplication
+            collector = IOCCollector(sources, observers=[anomalies.observe])
+            try:
+                _stream_report(partial, path, collector, analyzers, sinks, campaigns, profiler)
+                campaigns.save()
+                detected = anomalies.close_run()
+                anomalies.save()
+                partial.replace(path)
+            except BaseException:
+                for leftover in [partial, *export.export_files(path)]:
+                    leftover.unlink(missing_ok=True)
+                raise
+            if detected:
+                anomaly_report = anomaly_report_path(reports_dir, timestamp)
+                anomaly_report.parent.mkdir(parents=True, exist_ok=True)
+                anomaly_report.write_text(json.dumps(detected, indent=2))
+            # Source cursors only advance once the report is on disk
+            collector.commit()
+    metrics.PIPELINE_RUN_SECONDS.observe(time.perf_counter() - start, trigger=trigger)
+    return path
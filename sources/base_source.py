@@ -4,7 +4,9 @@ Abstract base class for threat intelligence sources.
 Implementations of this class should override the :meth:`fetch` method
 to retrieve indicators of compromise (IOCs), vulnerabilities or other
 relevant data.  Each subclass must define a class attribute ``name``
-with a unique string identifying the source.
+with a unique string identifying the source.  Sources that remember
+how far they have read (e.g. a TAXII cursor) do so in :meth:`commit`,
+which the caller invokes only after a run's output has been persisted.
 """
 
 from abc import ABC, abstractmethod
@@ -37,3 +39,12 @@ class BaseSource(ABC):
             An iterable of dictionaries describing indicators.
         """
         raise NotImplementedError
+
+    def commit(self) -> None:
+        """Acknowledge that everything returned by the last :meth:`fetch` was persisted.
+
+        Sources that resume from a saved position should store it here
+        rather than while fetching, so records still in flight when a
+        run fails are fetched again next time.  The default does nothing.
+        """
+        return None
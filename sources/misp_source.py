@@ -8,11 +8,64 @@ the expected internal format.  See the accompanying documentation
 for details on MISP's features【789715400982995†L166-L189】.
 """
 
-from typing import Iterable, Mapping, Any
+from typing import Iterable, Mapping, Any, Optional, Dict
 
 from .base_source import BaseSource
 
 
+#: MISP attribute types mapped to internal indicator types.
+MISP_TYPE_MAP = {
+    "ip-src": "ip",
+    "ip-dst": "ip",
+    "ip-src|port": "ip",
+    "ip-dst|port": "ip",
+    "domain": "domain",
+    "hostname": "domain",
+    "domain|ip": "domain",
+    "url": "url",
+    "uri": "url",
+    "link": "url",
+    "md5": "hash",
+    "sha1": "hash",
+    "sha256": "hash",
+    "sha512": "hash",
+    "filename|md5": "hash",
+    "filename|sha1": "hash",
+    "filename|sha256": "hash",
+    "email-src": "email",
+    "email-dst": "email",
+}
+
+
+def normalize_attribute(attribute: Mapping[str, Any], source: str = "misp") -> Optional[Dict[str, Any]]:
+    """Convert a MISP attribute into the internal indicator format.
+
+    Composite values such as ``ip-dst|port`` or ``filename|sha256`` are
+    reduced to the part that identifies the indicator.  Returns ``None``
+    for attribute types that are not indicators.
+    """
+    misp_type = str(attribute.get("type", ""))
+    ioc_type = MISP_TYPE_MAP.get(misp_type)
+    value = attribute.get("value")
+    if ioc_type is None or not value:
+        return None
+    value = str(value).strip()
+    if "|" in misp_type:
+        left, _, right = value.partition("|")
+        value = right if misp_type.startswith("filename|") else left
+    if ioc_type in ("domain", "hash", "email"):
+        value = value.lower()
+    tags = [t.get("name") if isinstance(t, Mapping) else str(t) for t in attribute.get("Tag") or []]
+    return {
+        "indicator": value,
+        "type": ioc_type,
+        "source": source,
+        "confidence": "high" if attribute.get("to_ids") in (True, "1", 1) else "medium",
+        "timestamp": attribute.get("timestamp"),
+        "tags": tags,
+    }
+
+
 class MispSource(BaseSource):
     """Threat intelligence source for MISP feeds."""
 
@@ -0,0 +1 @@
+"""Persistence modules for historical indicator data."""
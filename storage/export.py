@@ -0,0 +1,304 @@
+"""
+Byte‑level indicator exports for bulk consumers.
+
+Alongside every ``intel_report_<timestamp>.json`` the pipeline writes an
+``.ndjson`` copy with one indicator per line plus an ``.idx`` file of
+line start offsets (one unsigned 64‑bit integer per item).  Serving a
+page of ``limit`` items starting at ``cursor`` is then two index reads
+and a byte‑range copy: the stored JSON is never decoded or re‑encoded.
+
+Responses can be compressed with gzip or, when :mod:`zstandard` is
+installed, zstd.  Full exports are compressed once and cached next to
+the report; pages are compressed on the fly.  Arrow IPC and Parquet
+output is available when :mod:`pyarrow` is installed and is likewise
+cached for full exports.
+
+Items are JSON‑encoded once per batch and shared between the report
+and the export via :func:`tee_encoded`.
+"""
+
+import io
+import json
+import os
+import tempfile
+import zlib
+from array import array
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+try:
+    import zstandard  # type: ignore
+except ImportError:
+    zstandard = None  # type: ignore
+
+try:
+    import pyarrow  # type: ignore
+    import pyarrow.json as pyarrow_json  # type: ignore
+    import pyarrow.parquet as pyarrow_parquet  # type: ignore
+except ImportError:
+    pyarrow = None  # type: ignore
+    pyarrow_json = None  # type: ignore
+    pyarrow_parquet = None  # type: ignore
+
+
+#: Media types of the supported export formats.
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "arrow": "application/vnd.apache.arrow.stream",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+#: File suffixes of the cached full exports per (format, encoding).
+_CACHE_SUFFIX = {"ndjson": ".ndjson", "arrow": ".arrow", "parquet": ".parquet"}
+_ENCODING_SUFFIX = {"identity": "", "gzip": ".gz", "zstd": ".zst"}
+
+CHUNK_BYTES = 1024 * 1024
+
+
+def export_path(report_path: Path) -> Path:
+    """Return the NDJSON export belonging to an intel report."""
+    return report_path.with_suffix(".ndjson")
+
+
+def export_files(report_path: Path) -> List[Path]:
+    """Return every export artefact (NDJSON, index and caches) of a report."""
+    suffixes = {".idx"} | {
+        fmt_suffix + enc_suffix for fmt_suffix in _CACHE_SUFFIX.values() for enc_suffix in _ENCODING_SUFFIX.values()
+    }
+    stem = report_path.stem
+    return sorted(p for p in report_path.parent.glob(stem + ".*") if p.name[len(stem):] in suffixes)
+
+
+class ExportWriter:
+    """Write pre‑encoded items as NDJSON plus an offset index.
+
+    Files are written under temporary names and published by
+    :meth:`close`, so readers never observe a partial export;
+    :meth:`abort` removes them instead.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._data_tmp = self.path.with_suffix(".ndjson.partial")
+        self._index_tmp = self.path.with_suffix(".idx.partial")
+        self._data = self._data_tmp.open("wb")
+        self._index = self._index_tmp.open("wb")
+        self.count = 0
+        self._offset = 0
+
+    def write_encoded(self, lines: Iterable[str]) -> None:
+        offsets = array("Q")
+        chunks = []
+        for line in lines:
+            data = line.encode("utf-8") + b"\n"
+            offsets.append(self._offset)
+            self._offset += len(data)
+            chunks.append(data)
+        self._data.write(b"".join(chunks))
+        offsets.tofile(self._index)
+        self.count += len(offsets)
+
+    def write(self, items: Iterable[Mapping[str, Any]]) -> None:
+        self.write_encoded(json.dumps(item, default=str) for item in items)
+
+    def close(self) -> None:
+        # The index ends with the total size so every item has an end offset
+        array("Q", [self._offset]).tofile(self._index)
+        self._data.close()
+        self._index.close()
+        os.replace(self._index_tmp, self.path.with_suffix(".idx"))
+        os.replace(self._data_tmp, self.path)
+
+    def abort(self) -> None:
+        """Discard an unfinished export and its temporary files."""
+        self._data.close()
+        self._index.close()
+        self._data_tmp.unlink(missing_ok=True)
+        self._index_tmp.unlink(missing_ok=True)
+
+
+def tee_encoded(*writers: Any) -> Callable[[Sequence[Mapping[str, Any]]], None]:
+    """Return a pipeline sink that encodes each batch once and feeds ``writers``.
+
+    Each writer must provide ``write_encoded(lines)``.
+    """
+
+    def sink(batch: Sequence[Mapping[str, Any]]) -> None:
+        lines = [json.dumps(item, default=str) for item in batch]
+        for writer in writers:
+            writer.write_encoded(lines)
+
+    return sink
+
+
+class ExportReader:
+    """Random access to the items of an NDJSON export by position."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.index_path = self.path.with_suffix(".idx")
+        # The index holds one offset per item plus the trailing file size
+        self.count = max(self.index_path.stat().st_size // 8 - 1, 0)
+
+    def _offset(self, f: Any, position: int) -> int:
+        f.seek(position * 8)
+        return array("Q", f.read(8))[0]
+
+    def byte_range(self, cursor: int = 0, limit: Optional[int] = None) -> Tuple[int, int, int]:
+        """Return ``(start, end, next_cursor)`` for a page of items.
+
+        ``next_cursor`` equals :attr:`count` when the page reaches the end.
+        A ``limit`` below 1 raises :class:`ValueError`, as such a page
+        would never advance the cursor.
+        """
+        if limit is not None and limit < 1:
+            raise ValueError(f"limit must be at least 1, got {limit}")
+        cursor = min(max(cursor, 0), self.count)
+        stop = self.count if limit is None else min(cursor + limit, self.count)
+        with self.index_path.open("rb") as f:
+            return self._offset(f, cursor), self._offset(f, stop), stop
+
+    def iter_bytes(self, start: int, end: int, chunk_bytes: int = CHUNK_BYTES) -> Iterator[bytes]:
+        with self.path.open("rb") as f:
+            f.seek(start)
+            remaining = end - start
+            while remaining > 0:
+                chunk = f.read(min(chunk_bytes, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+
+    def read_bytes(self, start: int, end: int) -> bytes:
+        return b"".join(self.iter_bytes(start, end))
+
+
+def available_encodings() -> List[str]:
+    """Return supported content encodings in order of preference."""
+    return (["zstd"] if zstandard is not None else []) + ["gzip", "identity"]
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> str:
+    """Pick a content encoding for an ``Accept-Encoding`` header value."""
+    if not accept_encoding:
+        return "identity"
+    weights = {}
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[token.strip().lower()] = q
+    # identity stays acceptable unless explicitly refused, but is the last resort
+    best, best_q = "identity", weights.get("identity", 0.001)
+    for encoding in available_encodings()[:-1]:
+        q = weights.get(encoding, weights.get("*", 0.0))
+        # available_encodings() is ordered by preference, so ties keep the earlier one
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def compress_stream(chunks: Iterable[bytes], encoding: str, level: Optional[int] = None) -> Iterator[bytes]:
+    """Compress an iterable of byte chunks incrementally."""
+    if encoding == "identity":
+        yield from chunks
+        return
+    if encoding == "gzip":
+        # wbits=31 produces a gzip container
+        compressor = zlib.compressobj(6 if level is None else level, zlib.DEFLATED, 31)
+        for chunk in chunks:
+            out = compressor.compress(chunk)
+            if out:
+                yield out
+        yield compressor.flush()
+        return
+    if encoding == "zstd":
+        if zstandard is None:
+            raise RuntimeError("zstandard is not installed")
+        compressor = zstandard.ZstdCompressor(level=3 if level is None else level).compressobj()
+        for chunk in chunks:
+            out = compressor.compress(chunk)
+            if out:
+                yield out
+        yield compressor.flush()
+        return
+    raise ValueError(f"Unknown encoding: {encoding}")
+
+
+def _to_table(data: bytes) -> Any:
+    try:
+        return pyarrow_json.read_json(io.BytesIO(data))
+    except pyarrow.ArrowInvalid:
+        # Heterogeneous nested fields (e.g. per-source ``data``) cannot be
+        # inferred as one struct type; fall back to JSON strings for those.
+        rows = [json.loads(line) for line in data.splitlines() if line]
+        for row in rows:
+            for key, value in row.items():
+                if isinstance(value, (dict, list)):
+                    row[key] = json.dumps(value)
+        return pyarrow.Table.from_pylist(rows)
+
+
+def encode_columnar(data: bytes, fmt: str) -> bytes:
+    """Convert NDJSON bytes into Arrow IPC stream or Parquet bytes."""
+    if pyarrow is None:
+        raise RuntimeError("pyarrow is not installed")
+    table = _to_table(data)
+    sink = io.BytesIO()
+    if fmt == "arrow":
+        with pyarrow.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+    elif fmt == "parquet":
+        pyarrow_parquet.write_table(table, sink, compression="zstd")
+    else:
+        raise ValueError(f"Unknown columnar format: {fmt}")
+    return sink.getvalue()
+
+
+def supported_formats() -> List[str]:
+    return ["ndjson"] + (["arrow", "parquet"] if pyarrow is not None else [])
+
+
+def page_chunks(reader: ExportReader, fmt: str, start: int, end: int) -> Iterator[bytes]:
+    """Yield the uncompressed body of a page in ``fmt``."""
+    if fmt == "ndjson":
+        return reader.iter_bytes(start, end)
+    return iter([encode_columnar(reader.read_bytes(start, end), fmt)])
+
+
+def cached_full_export(reader: ExportReader, fmt: str, encoding: str) -> Path:
+    """Return a file holding the complete export in ``fmt``/``encoding``.
+
+    The file is generated on first use and reused afterwards; reports
+    are immutable once published, so the cache never goes stale.
+    """
+    if fmt == "ndjson" and encoding == "identity":
+        return reader.path
+    # Parquet is compressed internally, so it is never wrapped again
+    if fmt == "parquet":
+        encoding = "identity"
+    target = reader.path.with_suffix(_CACHE_SUFFIX[fmt] + _ENCODING_SUFFIX[encoding])
+    if target.exists():
+        return target
+    # Concurrent first requests each write their own temporary file; the
+    # output is deterministic, so whichever publishes first wins
+    fd, tmp = tempfile.mkstemp(prefix=target.name + ".", suffix=".partial", dir=target.parent)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            start, end, _ = reader.byte_range()
+            for chunk in compress_stream(page_chunks(reader, fmt, start, end), encoding):
+                f.write(chunk)
+        if target.exists():
+            os.unlink(tmp)
+        else:
+            os.replace(tmp, target)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+    return target
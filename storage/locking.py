@@ -0,0 +1,56 @@
+"""
+Exclusive locks around persisted analyzer state.
+
+Campaign forests and anomaly series are loaded at the start of a run
+and written back at the end.  Two runs overlapping (for instance
+concurrent ``POST /collect-and-analyze`` requests, or the API and the
+scheduler sharing ``REPORTS_DIR``) would each save their own view and
+the last writer would silently discard the other's updates.
+:func:`state_lock` serialises such runs: it takes an in‑process lock
+per path and, where :mod:`fcntl` is available, an advisory ``flock`` on
+a ``.lock`` file next to the state so other processes wait as well.
+"""
+
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+try:
+    import fcntl  # type: ignore
+except ImportError:
+    fcntl = None  # type: ignore
+
+
+_LOCKS: Dict[str, threading.Lock] = {}
+_LOCKS_GUARD = threading.Lock()
+
+
+def lock_path(path: Path) -> Path:
+    """Return the lock file used for the state at ``path``."""
+    path = Path(path)
+    return path.with_name(path.name + ".lock")
+
+
+@contextmanager
+def state_lock(path: Optional[Path]) -> Iterator[None]:
+    """Hold an exclusive lock on the state at ``path`` (no‑op for ``None``)."""
+    if path is None:
+        yield
+        return
+    target = lock_path(path)
+    key = os.path.abspath(target)
+    with _LOCKS_GUARD:
+        lock = _LOCKS.setdefault(key, threading.Lock())
+    with lock:
+        if fcntl is None:
+            yield
+            return
+        target.parent.mkdir(parents=True, exist_ok=True)
+        with target.open("a") as handle:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
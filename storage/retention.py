@@ -0,0 +1,615 @@
+"""
+Time‑decay expiry and compaction of historical intel reports.
+
+Every collection run writes a full ``intel_report_<timestamp>.json``
+snapshot to ``REPORTS_DIR``, so the directory grows forever and each
+snapshot repeats all unchanged indicators.  :class:`Compactor` folds
+those snapshots into a deduplicated store under ``REPORTS_DIR/store``.
+Indicators are spread over a fixed number of shards by a hash of their
+value (:func:`shard_of`), and every shard is a base plus deltas:
+
+* ``shards/<nnn>/base.json`` – every live indicator of the shard keyed
+  by value, with ``first_seen``/``last_seen`` timestamps.
+* ``shards/<nnn>/deltas/delta_<seq>.json`` – changes applied in
+  sequence on top of the base: new or changed items in full, the keys
+  of unchanged indicators that were observed again (which only moves
+  their ``last_seen`` to the delta's ``seen_at``) and expired keys.
+  Upserts written by :meth:`Compactor.ingest` carry no ``first_seen``;
+  it is taken from the existing record (if any) when the delta is
+  applied, so ingesting never needs the current state in memory.
+* ``manifest.json`` – the shard count, the snapshots already merged,
+  the live count and earliest pending expiry per shard, the exports
+  kept past their report (see below) and the time of the last
+  compaction.
+* ``anomalies/anomalies_<timestamp>.json`` – volume anomalies reported
+  by each run; files older than ``anomaly_ttl`` are removed.
+
+An indicator counts as unchanged when everything but its
+:data:`VOLATILE_FIELDS` (timestamps stamped at fetch time, campaign and
+anomaly annotations) matches the stored record; the store keeps the
+volatile values of the snapshot in which its content last changed.
+
+Compaction first streams new snapshots (from their NDJSON export where
+there is one) into one spool file per shard, then replays, merges and
+expires one shard at a time, so memory is bounded by the largest shard
+rather than the whole store.  Shards with nothing to merge, nothing due
+to expire and few deltas are not read at all.
+
+Indicators age out according to a type‑specific TTL measured from the
+last time they were observed; IP addresses go stale much faster than
+file hashes.  Once a shard has more than ``max_deltas`` deltas they are
+merged into a fresh base.  Only the newest ``keep_snapshots`` raw
+reports (and their NDJSON exports and profiling artefacts) are
+retained so ``/reports/latest``, ``/export/indicators`` and the
+dashboard keep working while their directory scans stay bounded.  The
+export of a pruned report outlives it by ``export_grace`` (default 24
+hours, ``EXPORT_GRACE_HOURS``), so a client paging through it with a
+pinned ``report=`` link can finish its walk.
+``*.partial`` files left behind by failed runs are removed once they
+are older than ``partial_ttl``.
+
+Compaction and :meth:`Compactor.ingest` hold an exclusive lock on the
+store (see :mod:`~tdc_cyberintelligence.storage.locking`), so the
+scheduler, the API and the bulk importer can share it across
+processes; compaction only deletes the deltas it has replayed.
+Compaction can run from the command line::
+
+    python -m tdc_cyberintelligence.storage.retention --reports-dir reports
+
+as a periodic job in the scheduler, or in the background after
+``POST /collect-and-analyze`` once :meth:`Compactor.due`.  Either way it
+runs off the collection path, and overlapping runs in one process are
+skipped rather than queued.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+from datetime import datetime, timedelta
+from itertools import groupby
+from operator import itemgetter
+from pathlib import Path
+from typing import IO, Any, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Set, Tuple
+
+from ..profiling import ARTEFACT_SUFFIXES
+from ..sources.stix_source import iter_bundle_objects
+from .export import export_files, export_path
+from .locking import state_lock
+
+
+#: Default time‑to‑live per indicator type.
+DEFAULT_TTLS: Dict[str, timedelta] = {
+    "ip": timedelta(days=7),
+    "url": timedelta(days=14),
+    "domain": timedelta(days=30),
+    "osint": timedelta(days=30),
+    "stat": timedelta(days=1),
+    "hash": timedelta(days=365),
+}
+
+#: TTL for types not listed in :data:`DEFAULT_TTLS`.
+DEFAULT_TTL = timedelta(days=90)
+
+#: Number of shards of a new store.
+DEFAULT_SHARDS = 64
+
+REPORT_GLOB = "intel_report_*.json"
+
+#: Directory (below ``store``) and file pattern of per‑run anomaly reports.
+ANOMALY_DIR = "anomalies"
+ANOMALY_GLOB = "anomalies_*.json"
+
+_TIMESTAMP_FORMAT = "%Y%m%dT%H%M%SZ"
+
+#: Fields that change between runs without the indicator itself changing.
+VOLATILE_FIELDS = frozenset({"first_seen", "last_seen", "timestamp", "campaign_id", "campaign_size", "anomaly"})
+
+#: Pattern of files being written by a run (reports, exports, cached exports).
+PARTIAL_GLOB = "*.partial"
+
+_SPOOL_PREFIX = "spool-"
+
+
+def _parse_time(value: Any) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(str(value).rstrip("Z"))
+    except ValueError:
+        return None
+
+
+def _isoformat(value: datetime) -> str:
+    return value.isoformat() + "Z"
+
+
+def anomaly_report_path(reports_dir: Path, timestamp: str) -> Path:
+    """Return where the anomalies of the run at ``timestamp`` are written."""
+    return Path(reports_dir) / "store" / ANOMALY_DIR / f"anomalies_{timestamp}.json"
+
+
+def shard_of(key: str, shards: int) -> int:
+    """Return the shard holding the indicator ``key``."""
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=4).digest(), "big") % shards
+
+
+def _stable(record: Mapping[str, Any]) -> Dict[str, Any]:
+    return {k: v for k, v in record.items() if k not in VOLATILE_FIELDS}
+
+
+def _unchanged(record: Mapping[str, Any], item: Mapping[str, Any]) -> bool:
+    """Return whether ``item`` matches a stored ``record`` apart from its :data:`VOLATILE_FIELDS`."""
+    return _stable(record) == _stable(item)
+
+
+def _write_json_atomic(path: Path, doc: Any) -> None:
+    # Write to a temporary file first so readers never see a partial document
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(json.dumps(doc, default=str))
+    os.replace(tmp, path)
+
+
+def _snapshot_time(path: Path) -> str:
+    """Return when the snapshot at ``path`` was taken, from its name or else its mtime."""
+    try:
+        taken = datetime.strptime(path.stem[len("intel_report_"):], _TIMESTAMP_FORMAT)
+    except ValueError:
+        taken = datetime.utcfromtimestamp(path.stat().st_mtime)
+    return _isoformat(taken)
+
+
+def _iter_snapshot(path: Path) -> Iterator[Mapping[str, Any]]:
+    """Stream the items of a report, from its NDJSON export when there is one."""
+    ndjson = export_path(path)
+    if ndjson.exists():
+        with ndjson.open("rb") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        return
+    with path.open("rb") as f:
+        yield from iter_bundle_objects(f, prefix="items")
+
+
+class Compactor:
+    """Merge intel report snapshots into a sharded, deduplicated base plus deltas.
+
+    Parameters
+    ----------
+    reports_dir: Path
+        Directory containing ``intel_report_*.json`` snapshots.
+    ttls: Mapping[str, timedelta], optional
+        Per‑type TTL overrides merged over :data:`DEFAULT_TTLS`.
+    keep_snapshots: int
+        Number of newest raw snapshots to leave in place.
+    max_deltas: int
+        Number of delta files per shard tolerated before they are folded
+        into the shard's base.
+    anomaly_ttl: timedelta
+        Age after which per‑run anomaly reports are deleted.
+    partial_ttl: timedelta
+        Age after which ``*.partial`` files of failed runs are deleted.
+        Must exceed the longest run, whose partials are still being written.
+    export_grace: timedelta, optional
+        How long the export files of a pruned report are kept.  Defaults
+        to ``EXPORT_GRACE_HOURS`` (24 hours).
+    shards: int
+        Number of shards of a new store; an existing store keeps the
+        count recorded in its manifest.
+    """
+
+    def __init__(
+        self,
+        reports_dir: Path,
+        ttls: Optional[Mapping[str, timedelta]] = None,
+        keep_snapshots: int = 1,
+        max_deltas: int = 10,
+        anomaly_ttl: timedelta = DEFAULT_TTL,
+        partial_ttl: timedelta = timedelta(days=1),
+        export_grace: Optional[timedelta] = None,
+        shards: int = DEFAULT_SHARDS,
+    ):
+        self.reports_dir = Path(reports_dir)
+        self.store_dir = self.reports_dir / "store"
+        self.shards_dir = self.store_dir / "shards"
+        self.manifest_path = self.store_dir / "manifest.json"
+        self.ttls = dict(DEFAULT_TTLS)
+        self.ttls.update(ttls or {})
+        self.keep_snapshots = keep_snapshots
+        self.max_deltas = max_deltas
+        self.anomaly_ttl = anomaly_ttl
+        self.partial_ttl = partial_ttl
+        if export_grace is None:
+            export_grace = timedelta(hours=float(os.environ.get("EXPORT_GRACE_HOURS", "24")))
+        self.export_grace = export_grace
+        self.default_shards = shards
+        self._lock = threading.Lock()
+
+    def ttl_for(self, ioc_type: Optional[str]) -> timedelta:
+        return self.ttls.get(ioc_type or "", DEFAULT_TTL)
+
+    # -- layout ------------------------------------------------------------
+    def shard_dir(self, shard: int) -> Path:
+        return self.shards_dir / f"{shard:03d}"
+
+    def base_path(self, shard: int) -> Path:
+        return self.shard_dir(shard) / "base.json"
+
+    def seq_path(self, shard: int) -> Path:
+        # Sequence number of the base, so new deltas can be numbered without loading it
+        return self.shard_dir(shard) / "base.seq"
+
+    def deltas_dir(self, shard: int) -> Path:
+        return self.shard_dir(shard) / "deltas"
+
+    def _delta_paths(self, shard: int) -> List[Path]:
+        deltas_dir = self.deltas_dir(shard)
+        if not deltas_dir.exists():
+            return []
+        # Zero-padded sequence numbers keep lexical order equal to apply order
+        return sorted(deltas_dir.glob("delta_*.json"))
+
+    def _read_manifest(self) -> Dict[str, Any]:
+        manifest: Dict[str, Any] = {"shards": self.default_shards, "snapshots": [], "shard_meta": {}, "exports": {}}
+        if self.manifest_path.exists():
+            manifest.update(json.loads(self.manifest_path.read_text()))
+        return manifest
+
+    def _write_manifest(self, manifest: Mapping[str, Any]) -> None:
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        _write_json_atomic(self.manifest_path, manifest)
+
+    def due(self, interval: timedelta, now: Optional[datetime] = None) -> bool:
+        """Return whether the last compaction finished more than ``interval`` ago."""
+        last = _parse_time(self._read_manifest().get("compacted_at"))
+        return last is None or (now or datetime.utcnow()) - last >= interval
+
+    # -- shard state ---------------------------------------------------------
+    def load_state(self) -> Dict[str, Dict[str, Any]]:
+        """Return the current indicator set (every shard's base with its deltas applied).
+
+        This holds the whole store in memory; compaction itself never does.
+        """
+        state: Dict[str, Dict[str, Any]] = {}
+        for shard in range(self._read_manifest()["shards"]):
+            state.update(self._replay(shard)[0])
+        return state
+
+    def _replay(self, shard: int) -> Tuple[Dict[str, Dict[str, Any]], int, List[Path]]:
+        """Return the live state of ``shard``, its next delta sequence and the deltas replayed."""
+        state: Dict[str, Dict[str, Any]] = {}
+        seq = 0
+        base_path = self.base_path(shard)
+        if base_path.exists():
+            base = json.loads(base_path.read_text())
+            state = base.get("items", {})
+            seq = base.get("seq", 0)
+        replayed = self._delta_paths(shard)
+        for delta_path in replayed:
+            delta = json.loads(delta_path.read_text())
+            for key, record in delta.get("upserts", {}).items():
+                if "first_seen" not in record:
+                    previous = state.get(key)
+                    record["first_seen"] = previous.get("first_seen") if previous else record.get("last_seen")
+                state[key] = record
+            seen_at = delta.get("seen_at")
+            for key in delta.get("touched", []):
+                record = state.get(key)
+                if record is not None:
+                    record["last_seen"] = seen_at
+            for key in delta.get("expired", []):
+                state.pop(key, None)
+            seq = max(seq, delta.get("seq", 0))
+        return state, seq + 1, replayed
+
+    def _next_seq(self, shard: int) -> int:
+        """Return the next delta sequence number of ``shard`` without replaying it."""
+        deltas = self._delta_paths(shard)
+        if deltas:
+            return int(deltas[-1].stem.split("_")[-1]) + 1
+        if self.seq_path(shard).exists():
+            return int(self.seq_path(shard).read_text()) + 1
+        return 1
+
+    def _write_delta(
+        self,
+        shard: int,
+        seq: int,
+        upserts: Mapping[str, Any],
+        expired: List[str],
+        touched: Sequence[str] = (),
+        seen_at: Optional[str] = None,
+    ) -> Path:
+        doc = {"seq": seq, "seen_at": seen_at, "upserts": upserts, "touched": list(touched), "expired": expired}
+        path = self.deltas_dir(shard) / f"delta_{seq:010d}.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        _write_json_atomic(path, doc)
+        return path
+
+    def _merge_items(
+        self, state: Dict[str, Dict[str, Any]], items: Iterable[Mapping[str, Any]], seen_at: str
+    ) -> Tuple[Dict[str, Dict[str, Any]], List[str]]:
+        """Apply snapshot items to ``state``; return changed records and keys of unchanged ones."""
+        upserts: Dict[str, Dict[str, Any]] = {}
+        touched: List[str] = []
+        for item in items:
+            key = str(item["indicator"])
+            previous = state.get(key)
+            if previous is not None and _unchanged(previous, item):
+                previous["last_seen"] = seen_at
+                if key not in upserts:
+                    touched.append(key)
+                continue
+            record = dict(item)
+            record["first_seen"] = previous.get("first_seen", seen_at) if previous else seen_at
+            record["last_seen"] = seen_at
+            state[key] = record
+            upserts[key] = record
+        return upserts, touched
+
+    def _expire(self, state: Dict[str, Dict[str, Any]], now: datetime) -> Tuple[List[str], Optional[str]]:
+        """Drop stale records; return their keys and the earliest expiry among the rest."""
+        expired = []
+        next_expiry: Optional[datetime] = None
+        for key, record in state.items():
+            last_seen = _parse_time(record.get("last_seen"))
+            if last_seen is None:
+                continue
+            expires = last_seen + self.ttl_for(record.get("type"))
+            if now > expires:
+                expired.append(key)
+            elif next_expiry is None or expires < next_expiry:
+                next_expiry = expires
+        for key in expired:
+            del state[key]
+        return expired, _isoformat(next_expiry) if next_expiry is not None else None
+
+    def _needs_work(self, shard: int, meta: Optional[Mapping[str, Any]], spooled: bool, now: datetime) -> bool:
+        if spooled or meta is None:
+            return spooled or self.shard_dir(shard).exists()
+        next_expiry = _parse_time(meta.get("next_expiry"))
+        if next_expiry is not None and now > next_expiry:
+            return True
+        return len(self._delta_paths(shard)) > self.max_deltas
+
+    def _compact_shard(self, shard: int, spool: Optional[Path], now: datetime, stats: Dict[str, int]) -> Dict[str, Any]:
+        """Merge the spooled snapshot items into ``shard`` and expire it; return its manifest entry."""
+        state, seq, replayed = self._replay(shard)
+        written: List[Path] = []
+        if spool is not None:
+            with spool.open() as f:
+                # Spooled lines are [seen_at, item] in snapshot order
+                for seen_at, rows in groupby(map(json.loads, f), key=itemgetter(0)):
+                    upserts, touched = self._merge_items(state, (item for _, item in rows), seen_at)
+                    if upserts or touched:
+                        written.append(self._write_delta(shard, seq, upserts, [], touched, seen_at))
+                        seq += 1
+                    stats["upserted"] += len(upserts)
+                    stats["refreshed"] += len(touched)
+
+        expired, next_expiry = self._expire(state, now)
+        stats["expired"] += len(expired)
+        if expired:
+            written.append(self._write_delta(shard, seq, {}, expired))
+            seq += 1
+
+        if len(replayed) + len(written) > self.max_deltas:
+            base = {"compacted_at": _isoformat(now), "seq": seq - 1, "items": state}
+            _write_json_atomic(self.base_path(shard), base)
+            self.seq_path(shard).write_text(str(seq - 1))
+            # Only what this compaction read or wrote; the store lock keeps
+            # other writers out, but never delete a delta that was not applied
+            for delta_path in replayed + written:
+                delta_path.unlink()
+        return {"live": len(state), "next_expiry": next_expiry}
+
+    # -- snapshots -----------------------------------------------------------
+    def _spool(self, snapshots: Sequence[Path], spool_dir: Path, shards: int) -> Tuple[List[str], Set[int]]:
+        """Partition the items of ``snapshots`` into one spool file per shard.
+
+        Returns the names of the snapshots spooled and the shards that
+        received items.  A snapshot that cannot be read is left out
+        entirely (and left in place) rather than half merged.
+        """
+        files: Dict[int, IO[str]] = {}
+        spooled: List[str] = []
+        try:
+            for path in snapshots:
+                positions = {shard: f.tell() for shard, f in files.items()}
+                seen_at = _snapshot_time(path)
+                try:
+                    for item in _iter_snapshot(path):
+                        key = item.get("indicator")
+                        if key is None:
+                            continue
+                        shard = shard_of(str(key), shards)
+                        f = files.get(shard)
+                        if f is None:
+                            f = files[shard] = (spool_dir / f"{shard:03d}.ndjson").open("w+")
+                        f.write(json.dumps([seen_at, item], default=str) + "\n")
+                except Exception:
+                    for shard, f in files.items():
+                        f.truncate(positions.get(shard, 0))
+                        f.seek(positions.get(shard, 0))
+                    continue
+                spooled.append(path.name)
+        finally:
+            for f in files.values():
+                f.close()
+        return spooled, set(files)
+
+    def _prune_snapshots(
+        self, snapshots: Sequence[Path], merged: Set[str], exports: Dict[str, str], now: datetime
+    ) -> List[str]:
+        """Drop raw snapshots represented in the store; return the merged names still on disk.
+
+        Their exports stay for :attr:`export_grace`; ``exports`` records
+        when each report was pruned.
+        """
+        keep = snapshots[-self.keep_snapshots:] if self.keep_snapshots else []
+        for path in snapshots:
+            if path not in keep and path.name in merged:
+                if self.export_grace > timedelta(0) and export_files(path):
+                    exports[path.stem] = _isoformat(now)
+                else:
+                    for artefact in export_files(path):
+                        artefact.unlink()
+                path.unlink()
+        return [p.name for p in keep if p.name in merged]
+
+    def _prune_exports(self, exports: Dict[str, str], now: datetime) -> int:
+        """Delete exports whose report was pruned more than :attr:`export_grace` ago."""
+        removed = 0
+        for stem, pruned_at in list(exports.items()):
+            pruned = _parse_time(pruned_at)
+            if pruned is not None and now - pruned <= self.export_grace:
+                continue
+            for artefact in export_files(self.reports_dir / f"{stem}.json"):
+                artefact.unlink(missing_ok=True)
+                removed += 1
+            del exports[stem]
+        return removed
+
+    def _prune_anomalies(self, now: datetime) -> int:
+        removed = 0
+        for path in sorted((self.store_dir / ANOMALY_DIR).glob(ANOMALY_GLOB)):
+            try:
+                written = datetime.strptime(path.stem[len("anomalies_"):], _TIMESTAMP_FORMAT)
+            except ValueError:
+                written = datetime.utcfromtimestamp(path.stat().st_mtime)
+            if now - written > self.anomaly_ttl:
+                path.unlink()
+                removed += 1
+        return removed
+
+    def _sweep(self, now: datetime) -> int:
+        """Delete leftovers of failed runs and profiling artefacts whose report is gone."""
+        removed = 0
+        stale = list(self.reports_dir.glob(PARTIAL_GLOB)) + list(self.store_dir.glob(_SPOOL_PREFIX + "*"))
+        for path in stale:
+            try:
+                if now - datetime.utcfromtimestamp(path.stat().st_mtime) <= self.partial_ttl:
+                    continue
+            except FileNotFoundError:
+                continue
+            if path.is_dir():
+                shutil.rmtree(path, ignore_errors=True)
+            else:
+                path.unlink(missing_ok=True)
+            removed += 1
+        for suffix in ARTEFACT_SUFFIXES:
+            for path in self.reports_dir.glob("intel_report_*" + suffix):
+                report = path.with_name(path.name[: -len(suffix)] + ".json")
+                if not report.exists():
+                    path.unlink(missing_ok=True)
+                    removed += 1
+        return removed
+
+    # -- entry points --------------------------------------------------------
+    def ingest(self, batches: Iterable[Sequence[Mapping[str, Any]]], seen_at: Optional[str] = None) -> int:
+        """Write batches of indicators straight into the store as deltas.
+
+        Used by bulk importers so large backfills bypass the JSON
+        snapshot files.  Each batch becomes one delta per shard it
+        touches; the next :meth:`compact` folds them into the bases as
+        usual.  The store is not replayed, so memory is bounded by a
+        single batch, and the store lock is only held while a batch's
+        deltas are written.
+
+        Returns
+        -------
+        int
+            Number of indicators written.
+        """
+        seen_at = seen_at or _isoformat(datetime.utcnow())
+        written = 0
+        for batch in batches:
+            with state_lock(self.manifest_path):
+                manifest = self._read_manifest()
+                shards = manifest["shards"]
+                by_shard: Dict[int, Dict[str, Dict[str, Any]]] = {}
+                for item in batch:
+                    key = item.get("indicator")
+                    if key is None:
+                        continue
+                    record = dict(item)
+                    record["last_seen"] = seen_at
+                    by_shard.setdefault(shard_of(str(key), shards), {})[str(key)] = record
+                for shard, upserts in by_shard.items():
+                    self._write_delta(shard, self._next_seq(shard), upserts, [], (), seen_at)
+                    # Unknown live count and expiry: the next compaction reads the shard
+                    manifest["shard_meta"].pop(str(shard), None)
+                    written += len(upserts)
+                if by_shard:
+                    self._write_manifest(manifest)
+        return written
+
+    def compact(self, now: Optional[datetime] = None) -> Dict[str, int]:
+        """Fold pending snapshots into the store and expire stale indicators.
+
+        Returns
+        -------
+        Dict[str, int]
+            Counts of processed snapshots, shards read, upserted (new or
+            changed), refreshed (seen again unchanged) and expired
+            indicators, deleted anomaly reports, deleted export files past
+            their grace period, swept partial and profiling files, and the
+            number of live indicators afterwards.
+        """
+        now = now or datetime.utcnow()
+        stats = {"snapshots": 0, "shards": 0, "upserted": 0, "refreshed": 0, "expired": 0, "anomaly_reports": 0,
+                 "exports": 0, "swept": 0, "live": 0}
+        # Skip rather than queue if this process is already compacting
+        if not self._lock.acquire(blocking=False):
+            return stats
+        try:
+            with state_lock(self.manifest_path):
+                self._compact_locked(now, stats)
+            return stats
+        finally:
+            self._lock.release()
+
+    def _compact_locked(self, now: datetime, stats: Dict[str, int]) -> None:
+        manifest = self._read_manifest()
+        shards = manifest["shards"]
+        merged = set(manifest["snapshots"])
+        snapshots = sorted(self.reports_dir.glob(REPORT_GLOB))
+        pending = [path for path in snapshots if path.name not in merged]
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        with tempfile.TemporaryDirectory(prefix=_SPOOL_PREFIX, dir=self.store_dir) as spool_dir:
+            spooled, touched_shards = self._spool(pending, Path(spool_dir), shards)
+            for shard in range(shards):
+                meta = manifest["shard_meta"].get(str(shard))
+                spool = Path(spool_dir) / f"{shard:03d}.ndjson" if shard in touched_shards else None
+                if self._needs_work(shard, meta, spool is not None, now):
+                    manifest["shard_meta"][str(shard)] = self._compact_shard(shard, spool, now, stats)
+                    stats["shards"] += 1
+        merged.update(spooled)
+        stats["snapshots"] = len(spooled)
+        manifest["snapshots"] = self._prune_snapshots(snapshots, merged, manifest["exports"], now)
+        stats["exports"] = self._prune_exports(manifest["exports"], now)
+        manifest["compacted_at"] = _isoformat(now)
+        self._write_manifest(manifest)
+        stats["anomaly_reports"] = self._prune_anomalies(now)
+        # After the snapshots, so their profiling artefacts go with them
+        stats["swept"] = self._sweep(now)
+        stats["live"] = sum(meta.get("live", 0) for meta in manifest["shard_meta"].values())
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compact and expire historical intel reports.")
+    parser.add_argument("--reports-dir", type=Path, default=Path(os.environ.get("REPORTS_DIR", "reports")))
+    parser.add_argument("--keep-snapshots", type=int, default=1)
+    parser.add_argument("--max-deltas", type=int, default=10)
+    args = parser.parse_args(argv)
+    stats = Compactor(args.reports_dir, keep_snapshots=args.keep_snapshots, max_deltas=args.max_deltas).compact()
+    print(json.dumps(stats))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,79 @@
+import random
+
+import pytest
+
+from ..analyzers.anomaly_analyzer import AnomalyAnalyzer, P2Quantile
+from ..collectors.ioc_collector import IOCCollector
+from ..sources.base_source import BaseSource
+
+
+@pytest.mark.parametrize("q", [0.5, 0.9, 0.95])
+def test_p2_tracks_the_exact_quantile(q):
+    rng = random.Random(7)
+    values = [rng.gauss(100, 15) for _ in range(20000)]
+    sketch = P2Quantile(q)
+    for value in values:
+        sketch.add(value)
+    exact = sorted(values)[int(q * (len(values) - 1))]
+    assert sketch.value() == pytest.approx(exact, rel=0.02)
+
+
+def test_p2_before_five_observations():
+    sketch = P2Quantile(0.5)
+    assert sketch.value() is None
+    for value in (3.0, 1.0, 2.0):
+        sketch.add(value)
+    assert sketch.value() == 2.0
+
+
+def test_p2_round_trips_through_dict():
+    sketch = P2Quantile(0.9)
+    for value in range(100):
+        sketch.add(float(value))
+    restored = P2Quantile.from_dict(sketch.to_dict())
+    for value in range(100, 150):
+        sketch.add(float(value))
+        restored.add(float(value))
+    assert restored.value() == sketch.value()
+
+
+def test_spike_and_silence_are_reported(tmp_path):
+    analyzer = AnomalyAnalyzer(tmp_path / "state.json", warmup_runs=3)
+    for _ in range(5):
+        list(analyzer.analyze([{"source": "otx", "type": "ip"}] * 10 + [{"source": "misp", "type": "hash"}] * 10))
+        assert analyzer.close_run() == []
+    analyzer.save()
+
+    analyzer = AnomalyAnalyzer(tmp_path / "state.json", warmup_runs=3)
+    items = list(analyzer.analyze([{"source": "otx", "type": "ip"}] * 100))
+    assert items[0]["anomaly"] is None
+    assert items[-1]["anomaly"]["kind"] == "spike"
+    kinds = {(a["kind"], a["series"]["source"]) for a in analyzer.close_run()}
+    assert kinds == {("spike", "otx"), ("silence", "misp")}
+
+
+class _Feed(BaseSource):
+    def __init__(self, name, indicators):
+        self.name = name
+        self.indicators = indicators
+
+    def fetch(self):
+        return [{"indicator": value, "type": "ip", "source": self.name} for value in self.indicators]
+
+
+def _volumes(sources):
+    analyzer = AnomalyAnalyzer()
+    collector = IOCCollector(sources, observers=[analyzer.observe])
+    for batch in collector.iter_batches(batch_size=7):
+        list(analyzer.analyze(batch))
+    analyzer.close_run()
+    return {key: stats.mean for key, stats in analyzer.series.items()}
+
+
+def test_volumes_are_counted_before_deduplication():
+    shared = [f"192.0.2.{i}" for i in range(30)]
+    otx = _Feed("otx", shared + ["198.51.100.1"])
+    misp = _Feed("misp", shared[:20])
+    expected = {("otx", "ip"): 31, ("misp", "ip"): 20}
+    assert _volumes([otx, misp]) == expected
+    assert _volumes([misp, otx]) == expected
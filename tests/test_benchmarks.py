@@ -0,0 +1,41 @@
+import pytest
+
+from ..benchmarks import run_benchmarks
+from ..benchmarks.synthetic_sources import build_sources
+
+
+def test_percentile_interpolates():
+    assert run_benchmarks.percentile([], 50) == 0.0
+    assert run_benchmarks.percentile([4.0, 1.0, 3.0, 2.0], 50) == pytest.approx(2.5)
+    assert run_benchmarks.percentile([1.0, 2.0], 100) == 2.0
+
+
+def test_measure_peak_mb_charges_only_the_function():
+    keep = bytearray(8 * 1024 * 1024)  # noqa: F841 - allocated before measuring
+    assert run_benchmarks.measure_peak_mb(lambda: bytearray(2 * 1024 * 1024)) == pytest.approx(2, abs=0.5)
+
+
+def test_compare_flags_latency_and_memory_regressions():
+    baseline = {"a": {"p50_s": 1.0, "peak_mem_mb": 10.0}, "b": {"p50_s": 1.0, "peak_mem_mb": 10.0}}
+    results = {
+        "a": {"p50_s": 1.2, "peak_mem_mb": 10.0},
+        "b": {"p50_s": 1.5, "peak_mem_mb": 20.0},
+        "new": {"p50_s": 9.0, "peak_mem_mb": 90.0},
+    }
+    regressions = run_benchmarks.compare(results, baseline, tolerance=0.25)
+    assert len(regressions) == 2
+    assert all(line.startswith("b:") for line in regressions)
+
+
+def test_synthetic_sources_are_deterministic():
+    first = [item for source in build_sources(200, 2, 0.3) for item in source.fetch()]
+    second = [item for source in build_sources(200, 2, 0.3) for item in source.fetch()]
+    assert first == second
+    assert len(first) == 200
+
+
+def test_run_covers_every_stage_end_to_end():
+    results = run_benchmarks.run(scale=200, repeat=1, n_sources=2)
+    assert "collector" in results and "pipeline.end_to_end" in results
+    assert {name for name, _ in run_benchmarks.build_stages()} <= set(results)
+    assert all(r["runs"] == 1 and r["peak_mem_mb"] >= 0 for r in results.values())
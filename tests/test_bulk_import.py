@@ -0,0 +1,61 @@
+import json
+
+from ..importers import bulk_import
+from ..importers.bulk_import import BulkImporter, normalize_row, split_ranges
+from ..storage.retention import Compactor
+
+
+def _write_csv(path, rows):
+    lines = ["indicator,type,source,confidence,tags"] + rows
+    path.write_text("\n".join(lines) + "\n")
+    return path
+
+
+def test_ranges_are_line_aligned_and_cover_the_file(tmp_path):
+    path = _write_csv(tmp_path / "dump.csv", [f"10.0.0.{i},ip,csv,high,a;b" for i in range(200)])
+    data = path.read_bytes()
+    ranges = split_ranges(path, chunk_bytes=100, skip_header=True)
+    assert len(ranges) > 10
+    assert ranges[0][0] == data.index(b"\n") + 1
+    assert ranges[-1][1] == len(data)
+    for (_, end), (start, _) in zip(ranges, ranges[1:]):
+        assert end == start and data[end - 1:end] == b"\n"
+
+
+def test_normalize_row_handles_csv_and_misp_rows():
+    assert normalize_row({"value": "Example.ORG", "tags": "a;b"}, "csv") == (
+        "example.org", "domain", "csv", "medium", None, ("a", "b"))
+    row = normalize_row({"type": "ip-dst", "value": "192.0.2.1", "to_ids": True}, "misp")
+    assert row[:3] == ("192.0.2.1", "ip", "misp")
+    assert normalize_row({"comment": "no indicator"}, "csv") is None
+
+
+def test_importer_dedups_across_chunks_and_files(tmp_path):
+    csv_path = _write_csv(tmp_path / "dump.csv", [f"10.0.0.{i % 150},ip,csv,high," for i in range(300)])
+    jsonl_path = tmp_path / "events.jsonl"
+    events = [
+        {"Event": {"Attribute": [{"type": "domain", "value": f"ex{i}.dk"}, {"type": "ip-dst", "value": "10.0.0.1"}]}}
+        for i in range(50)
+    ]
+    jsonl_path.write_text("\n".join(json.dumps(event) for event in events) + "\n")
+    json_path = tmp_path / "export.json"
+    json_path.write_text(json.dumps({"response": [{"Event": {"Attribute": [{"type": "md5", "value": "a" * 32}]}}]}))
+
+    importer = BulkImporter(workers=2, chunk_bytes=256, batch_size=40, max_pending=2)
+    batches = list(importer.iter_batches([csv_path, jsonl_path, json_path]))
+    indicators = [item["indicator"] for batch in batches for item in batch]
+    assert len(indicators) == len(set(indicators)) == 150 + 50 + 1
+    assert all(len(batch) <= 40 for batch in batches)
+    assert importer.stats["emitted"] == 201
+    assert importer.stats["duplicates"] == importer.stats["parsed"] - 201
+
+
+def test_cli_writes_batches_into_the_store(tmp_path, monkeypatch, capsys):
+    path = _write_csv(tmp_path / "dump.csv", [f"203.0.113.{i},ip,csv,high," for i in range(100)])
+    reports = tmp_path / "reports"
+    monkeypatch.setenv("REPORTS_DIR", str(reports))
+    assert bulk_import.main([str(path), "--store", "--workers", "1", "--batch-size", "30"]) == 0
+    assert json.loads(capsys.readouterr().out)["emitted"] == 100
+    state = Compactor(reports).load_state()
+    assert len(state) == 100
+    assert all(record["first_seen"] == record["last_seen"] for record in state.values())
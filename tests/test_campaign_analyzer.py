@@ -0,0 +1,108 @@
+import time
+
+from ..analyzers.campaign_analyzer import CampaignClusterAnalyzer, UnionFind
+
+
+def _forest():
+    forest = UnionFind()
+    a, b, c, d = (forest.add(key, member=True) for key in ("ioc:ip:a", "ioc:ip:b", "ioc:ip:c", "ioc:ip:d"))
+    group = forest.add("event_id:misp:1")
+    forest.union(a, group)
+    forest.union(group, b)
+    forest.union(c, d)
+    forest.keep_until(a, 100)
+    forest.keep_until(c, 50)
+    return forest
+
+
+def test_union_find_save_and_load_round_trip(tmp_path):
+    forest = _forest()
+    forest.save(tmp_path)
+    loaded = UnionFind.load(tmp_path)
+    assert loaded.keys == forest.keys
+    assert loaded.index == forest.index
+    for name in ("parent", "size", "members", "oldest", "expires"):
+        assert getattr(loaded, name) == getattr(forest, name)
+    root = loaded.find(loaded.index["ioc:ip:b"])
+    assert loaded.find(loaded.index["ioc:ip:a"]) == root
+    assert loaded.members[root] == 2
+    assert loaded.keys[loaded.oldest[root]] == "ioc:ip:a"
+    # A restored forest keeps growing where the saved one stopped
+    assert loaded.add("ioc:ip:e") == len(forest)
+
+
+def test_keys_with_line_breaks_round_trip(tmp_path):
+    forest = UnionFind()
+    keys = ["event_id:misp:a\rb", "event_id:misp:a\nb", "event_id:misp:a b", "ioc:domain:æøå", "ioc:ip:\ud800"]
+    for key in keys:
+        forest.add(key)
+    forest.save(tmp_path)
+    loaded = UnionFind.load(tmp_path)
+    assert loaded.keys == keys
+    assert len(loaded.index) == len(keys)
+
+
+def test_legacy_key_file_is_migrated(tmp_path):
+    forest = _forest()
+    forest.save(tmp_path)
+    (tmp_path / "nodes.bin").unlink()
+    (tmp_path / "nodes.txt").write_bytes("".join(key + "\n" for key in forest.keys).encode())
+    loaded = UnionFind.load(tmp_path)
+    assert loaded.keys == forest.keys
+    loaded.save(tmp_path)
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["forest.bin", "nodes.bin"]
+
+
+def test_union_find_load_without_state_is_empty(tmp_path):
+    assert len(UnionFind.load(tmp_path / "missing")) == 0
+
+
+def test_prune_drops_expired_components_only():
+    forest = _forest()
+    assert forest.prune(now=75) == 2
+    assert forest.keys == ["ioc:ip:a", "ioc:ip:b", "event_id:misp:1"]
+    root = forest.find(forest.index["ioc:ip:b"])
+    assert forest.members[root] == 2
+    assert forest.keys[forest.oldest[root]] == "ioc:ip:a"
+
+
+def test_close_run_resolves_ids_merged_by_later_batches():
+    analyzer = CampaignClusterAnalyzer()
+    first = list(analyzer.analyze([{"indicator": "b", "type": "ip", "source": "misp", "event_id": 2}]))
+    second = list(analyzer.analyze([{"indicator": "a", "type": "ip", "source": "misp", "event_id": 1}]))
+    third = list(analyzer.analyze([{"indicator": "c", "type": "ip", "source": "misp", "event_id": [1, 2]}]))
+    assert first[0]["campaign_size"] == 1
+    resolved = analyzer.close_run()
+    final = {(r["campaign_id"], r["campaign_size"]) for r in resolved.values()}
+    assert final == {(third[0]["campaign_id"], 3)}
+    # The surviving ID is listed because its earlier items were stamped with size 1
+    assert set(resolved) == {first[0]["campaign_id"], second[0]["campaign_id"]}
+    assert third[0]["campaign_id"] == first[0]["campaign_id"]
+    assert analyzer.close_run() == {}
+
+
+def test_close_run_omits_ids_that_did_not_change():
+    analyzer = CampaignClusterAnalyzer()
+    items = [{"indicator": f"192.0.2.{i}", "type": "ip", "source": "misp", "event_id": i % 3 + 1} for i in range(30)]
+    # Every campaign is complete within one chunk, so no annotation is stale
+    annotated = list(analyzer.analyze(items))
+    assert {item["campaign_size"] for item in annotated} == {10}
+    assert analyzer.close_run() == {}
+
+    def newcomer(n):
+        return {"indicator": f"198.51.100.{n}", "type": "ip", "source": "misp", "event_id": 1}
+
+    # Only the campaign that grew after its items were stamped is listed
+    stale = list(analyzer.analyze([items[0], items[1]]))
+    list(analyzer.analyze([newcomer(1)]))
+    campaign_id = stale[0]["campaign_id"]
+    assert analyzer.close_run() == {campaign_id: {"campaign_id": campaign_id, "campaign_size": 11}}
+
+
+def test_save_expires_campaigns_past_their_ttl(tmp_path):
+    analyzer = CampaignClusterAnalyzer(tmp_path)
+    list(analyzer.analyze([{"indicator": "1.2.3.4", "type": "ip", "event_id": 1},
+                           {"indicator": "d" * 64, "type": "hash", "event_id": 2}]))
+    assert analyzer.expire(now=time.time() + 30 * 86400) == 2
+    analyzer.save()
+    assert UnionFind.load(tmp_path).keys == ["ioc:hash:" + "d" * 64, "event_id::2"]
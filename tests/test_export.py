@@ -0,0 +1,79 @@
+import gzip
+import json
+
+import pytest
+
+from ..storage import export
+from ..storage.export import ExportReader, ExportWriter, cached_full_export, negotiate_encoding
+
+
+@pytest.fixture
+def reader(tmp_path):
+    writer = ExportWriter(tmp_path / "intel_report_x.ndjson")
+    writer.write([{"indicator": f"i{i}", "note": "ø" * (i % 3)} for i in range(10)])
+    writer.close()
+    return ExportReader(tmp_path / "intel_report_x.ndjson")
+
+
+def _items(reader, start, end):
+    return [json.loads(line)["indicator"] for line in reader.read_bytes(start, end).splitlines()]
+
+
+def test_byte_range_pages_cover_every_item_once(reader):
+    assert reader.count == 10
+    seen, cursor = [], 0
+    while cursor < reader.count:
+        start, end, cursor = reader.byte_range(cursor, 3)
+        seen.extend(_items(reader, start, end))
+    assert seen == [f"i{i}" for i in range(10)]
+    assert cursor == reader.count
+
+
+def test_byte_range_clamps_cursor_and_limit(reader):
+    size = reader.path.stat().st_size
+    assert reader.byte_range() == (0, size, 10)
+    assert reader.byte_range(8, 100)[2] == 10
+    assert reader.byte_range(-5, 1)[:2] == reader.byte_range(0, 1)[:2]
+    start, end, next_cursor = reader.byte_range(50, 5)
+    assert (start, end, next_cursor) == (size, size, 10)
+
+
+@pytest.mark.parametrize("limit", [0, -1])
+def test_byte_range_rejects_pages_that_never_advance(reader, limit):
+    with pytest.raises(ValueError):
+        reader.byte_range(4, limit)
+
+
+def test_empty_export(tmp_path):
+    writer = ExportWriter(tmp_path / "empty.ndjson")
+    writer.close()
+    reader = ExportReader(tmp_path / "empty.ndjson")
+    assert reader.count == 0
+    assert reader.byte_range(0, 10) == (0, 0, 0)
+
+
+@pytest.mark.parametrize("header, expected", [
+    (None, "identity"),
+    ("", "identity"),
+    ("gzip", "gzip"),
+    ("gzip;q=0, identity", "identity"),
+    ("deflate, br", "identity"),
+    ("*", "gzip"),
+    ("br;q=1.0, gzip;q=0.5", "gzip"),
+    ("gzip;q=0.1, identity;q=0.5", "identity"),
+    ("GZIP;q=bogus, identity;q=0.2", "identity"),
+])
+def test_negotiate_encoding(monkeypatch, header, expected):
+    monkeypatch.setattr(export, "zstandard", None)
+    assert negotiate_encoding(header) == expected
+
+
+def test_cached_full_export_is_reused(reader):
+    target = cached_full_export(reader, "ndjson", "gzip")
+    assert gzip.decompress(target.read_bytes()) == reader.path.read_bytes()
+    mtime = target.stat().st_mtime_ns
+    assert cached_full_export(reader, "ndjson", "gzip") == target
+    assert target.stat().st_mtime_ns == mtime
+    assert sorted(p.name for p in reader.path.parent.iterdir()) == [
+        "intel_report_x.idx", "intel_report_x.ndjson", "intel_report_x.ndjson.gz",
+    ]
@@ -0,0 +1,68 @@
+import pytest
+
+from .. import metrics
+from ..collectors.ioc_collector import IOCCollector
+from ..sources.base_source import BaseSource
+
+
+def test_render_uses_prometheus_exposition_format():
+    registry = metrics.MetricsRegistry()
+    counter = registry.counter("test_items_total", "Items seen.")
+    counter.inc(source="misp")
+    counter.inc(2, source="misp")
+    registry.gauge("test_depth", "Queue depth.").set(3, queue='a"b')
+    text = registry.render()
+    assert "# HELP test_items_total Items seen.\n# TYPE test_items_total counter\n" in text
+    assert 'test_items_total{source="misp"} 3.0' in text
+    assert 'test_depth{queue="a\\"b"} 3.0' in text
+    assert text.endswith("\n")
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = metrics.MetricsRegistry().histogram("test_seconds", "Latency.", buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 5.0):
+        histogram.observe(value, stage="x")
+    lines = histogram.render()
+    assert 'test_seconds_bucket{stage="x",le="0.1"} 1.0' in lines
+    assert 'test_seconds_bucket{stage="x",le="1.0"} 2.0' in lines
+    assert 'test_seconds_bucket{stage="x",le="+Inf"} 3.0' in lines
+    assert histogram.count(stage="x") == 3
+    assert histogram.sum(stage="x") == pytest.approx(5.55)
+
+
+def test_registering_twice_returns_the_same_family():
+    registry = metrics.MetricsRegistry()
+    assert registry.counter("test_total", "a") is registry.counter("test_total", "b")
+    with pytest.raises(ValueError):
+        registry.gauge("test_total", "c")
+
+
+def test_is_timeout_matches_by_class_name():
+    class ReadTimeout(IOError):
+        pass
+
+    assert metrics.is_timeout(TimeoutError())
+    assert metrics.is_timeout(ReadTimeout())
+    assert not metrics.is_timeout(ValueError())
+
+
+class _Static(BaseSource):
+    name = "metrics-test"
+
+    def __init__(self, items):
+        self.items = items
+
+    def fetch(self):
+        return self.items
+
+
+def test_collector_counts_items_and_duplicates():
+    items = [{"indicator": "198.51.100.1", "type": "ip", "source": "metrics-test"}] * 3
+    source = _Static(items)
+    name = source.name
+    fetched = metrics.SOURCE_ITEMS.value(source=name)
+    dropped = metrics.DEDUP_HITS.value()
+    assert len(IOCCollector([source]).collect()) == 1
+    assert metrics.SOURCE_ITEMS.value(source=name) - fetched == 3
+    assert metrics.DEDUP_HITS.value() - dropped == 2
+    assert metrics.DEDUP_RATIO.value() == pytest.approx(2 / 3)
@@ -0,0 +1,109 @@
+import threading
+import time
+
+import pytest
+
+from .. import metrics
+from ..analyzers.base_analyzer import BaseAnalyzer
+from ..collectors.ioc_collector import IOCCollector
+from ..pipeline import BoundedQueue, Pipeline, PipelineAborted
+from ..sources.base_source import BaseSource
+
+
+def _batch(i):
+    return [{"indicator": f"10.0.0.{i}", "type": "ip"}]
+
+
+def _drain(q, out):
+    thread = threading.Thread(target=lambda: out.extend(b[0]["indicator"] for b in q), daemon=True)
+    thread.start()
+    return thread
+
+
+def test_block_applies_backpressure():
+    q = BoundedQueue("test_block", maxsize=1)
+    q.put(_batch(0))
+    producer = threading.Thread(target=q.put, args=(_batch(1),), daemon=True)
+    producer.start()
+    producer.join(0.3)
+    assert producer.is_alive()
+
+    out = []
+    consumer = _drain(q, out)
+    producer.join(5)
+    assert not producer.is_alive()
+    q.close()
+    consumer.join(5)
+    assert out == ["10.0.0.0", "10.0.0.1"]
+    assert metrics.QUEUE_BLOCKED_SECONDS.value(queue="test_block") > 0
+
+
+def test_drop_discards_batches_when_full():
+    q = BoundedQueue("test_drop", maxsize=2, overflow="drop")
+    for i in range(5):
+        q.put(_batch(i))
+    out = []
+    consumer = _drain(q, out)
+    q.close()
+    consumer.join(5)
+    assert out == ["10.0.0.0", "10.0.0.1"]
+    assert metrics.QUEUE_DROPPED.value(queue="test_drop") == 3
+
+
+def test_spill_keeps_every_batch_and_cleans_up(tmp_path):
+    q = BoundedQueue("test_spill", maxsize=2, overflow="spill", spill_dir=str(tmp_path))
+    for i in range(50):
+        q.put(_batch(i))
+    assert len(list(tmp_path.iterdir())) == 1
+    out = []
+    start = time.perf_counter()
+    consumer = _drain(q, out)
+    q.close()
+    consumer.join(5)
+    # Spilled batches are read back without waiting on the in-memory queue
+    assert time.perf_counter() - start < 1.0
+    assert out == [f"10.0.0.{i}" for i in range(50)]
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_blocked_put_is_released_by_abort():
+    abort = threading.Event()
+    q = BoundedQueue("test_abort", maxsize=1, abort=abort)
+    q.put(_batch(0))
+    errors = []
+
+    def produce():
+        try:
+            q.put(_batch(1))
+        except PipelineAborted as exc:
+            errors.append(exc)
+
+    producer = threading.Thread(target=produce, daemon=True)
+    producer.start()
+    abort.set()
+    producer.join(5)
+    assert not producer.is_alive()
+    assert len(errors) == 1
+    assert list(q) == []
+
+
+class _Source(BaseSource):
+    name = "test"
+
+    def __init__(self, count):
+        self.count = count
+
+    def fetch(self):
+        for i in range(self.count):
+            yield {"indicator": f"i{i}", "type": "domain"}
+
+
+class _Failing(BaseAnalyzer):
+    def analyze(self, data):
+        raise ValueError("analyzer failed")
+
+
+def test_pipeline_failure_aborts_other_stages():
+    pipeline = Pipeline(IOCCollector([_Source(10000)]), [_Failing()], [lambda batch: None], batch_size=10, queue_size=1)
+    with pytest.raises(ValueError, match="analyzer failed"):
+        pipeline.run()
@@ -0,0 +1,44 @@
+import threading
+import tracemalloc
+
+from .. import profiling
+
+
+def test_profiling_is_opt_in(monkeypatch):
+    monkeypatch.delenv(profiling.PROFILE_ENV_VAR, raising=False)
+    assert profiling.get_profiler() is profiling.get_profiler(False)
+    assert not profiling.get_profiler().enabled
+    assert profiling.get_profiler(True).enabled
+    monkeypatch.setenv(profiling.PROFILE_ENV_VAR, "yes")
+    assert profiling.get_profiler().enabled
+
+
+def test_null_profiler_writes_nothing(tmp_path):
+    profiler = profiling.get_profiler(False)
+    with profiler, profiler.stage("load"), profiler.thread_stage("collect"):
+        pass
+    assert profiler.write(tmp_path, "intel_report_x") == []
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_run_profiler_writes_artefacts_per_stage(tmp_path):
+    tracing = tracemalloc.is_tracing()
+    profiler = profiling.RunProfiler(sample_interval=0.001)
+    with profiler:
+        with profiler.stage("load"):
+            data = [str(i) for i in range(10000)]
+
+        def work():
+            with profiler.thread_stage("worker", files=[__file__]):
+                data.extend(str(i) for i in range(10000))
+
+        thread = threading.Thread(target=work)
+        thread.start()
+        thread.join()
+    assert tracemalloc.is_tracing() == tracing
+
+    paths = profiler.write(tmp_path, "intel_report_x")
+    assert [p.name for p in paths] == [f"intel_report_x{suffix}" for suffix in profiling.ARTEFACT_SUFFIXES]
+    assert all(p.exists() for p in paths)
+    alloc = paths[2].read_text()
+    assert "== load:" in alloc and "== worker:" in alloc
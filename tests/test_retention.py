@@ -0,0 +1,150 @@
+import json
+import multiprocessing
+import os
+from datetime import datetime, timedelta
+
+from ..storage.retention import Compactor, anomaly_report_path
+
+NOW = datetime(2026, 1, 10, 12, 0, 0)
+
+
+def _report(reports_dir, when, items):
+    stamp = when.strftime("%Y%m%dT%H%M%SZ")
+    path = reports_dir / f"intel_report_{stamp}.json"
+    path.write_text(json.dumps({"generated_at": when.isoformat() + "Z", "items": items}))
+    return path
+
+
+def _ip(value, **extra):
+    return dict({"indicator": value, "type": "ip", "source": "otx"}, **extra)
+
+
+def test_unchanged_indicators_only_refresh_last_seen(tmp_path):
+    first, second = NOW - timedelta(days=2), NOW - timedelta(days=1)
+    _report(tmp_path, first, [_ip("192.0.2.1", timestamp="t1", campaign_size=1), _ip("192.0.2.2", tags=["a"])])
+    _report(tmp_path, second, [_ip("192.0.2.1", timestamp="t2", campaign_size=5), _ip("192.0.2.2", tags=["b"])])
+    stats = Compactor(tmp_path).compact(NOW)
+    assert (stats["snapshots"], stats["upserted"], stats["refreshed"]) == (2, 3, 1)
+
+    state = Compactor(tmp_path).load_state()
+    unchanged, changed = state["192.0.2.1"], state["192.0.2.2"]
+    assert unchanged["first_seen"] == first.isoformat() + "Z"
+    assert unchanged["last_seen"] == second.isoformat() + "Z"
+    assert unchanged["timestamp"] == "t1"
+    assert changed["tags"] == ["b"]
+    assert changed["first_seen"] == first.isoformat() + "Z"
+
+
+def test_indicators_expire_per_type(tmp_path):
+    _report(tmp_path, NOW - timedelta(days=8), [_ip("192.0.2.1"), {"indicator": "ab" * 32, "type": "hash"}])
+    stats = Compactor(tmp_path).compact(NOW)
+    assert stats["expired"] == 1
+    assert list(Compactor(tmp_path).load_state()) == ["ab" * 32]
+
+
+def test_old_snapshots_and_their_files_are_removed(tmp_path):
+    old = _report(tmp_path, NOW - timedelta(hours=2), [_ip("192.0.2.1")])
+    new = _report(tmp_path, NOW - timedelta(hours=1), [_ip("192.0.2.1")])
+    for suffix in (".ndjson", ".idx", ".pstats", ".folded", ".alloc.txt"):
+        old.with_suffix(suffix).write_text("")
+        new.with_suffix(suffix).write_text("")
+    compactor = Compactor(tmp_path, keep_snapshots=1, export_grace=timedelta(hours=24))
+    compactor.compact(NOW)
+    kept = (".json", ".ndjson", ".idx", ".pstats", ".folded", ".alloc.txt")
+    # The old export outlives its report for the grace period
+    grace = [old.with_suffix(".ndjson").name, old.with_suffix(".idx").name]
+    remaining = sorted(p.name for p in tmp_path.iterdir() if p.is_file())
+    assert remaining == sorted(grace + [new.with_suffix(suffix).name for suffix in kept])
+
+    assert compactor.compact(NOW + timedelta(hours=23))["exports"] == 0
+    assert compactor.compact(NOW + timedelta(hours=25))["exports"] == 2
+    remaining = sorted(p.name for p in tmp_path.iterdir() if p.is_file())
+    assert remaining == sorted(new.with_suffix(suffix).name for suffix in kept)
+
+
+def test_exports_are_removed_with_their_report_without_grace(tmp_path):
+    old = _report(tmp_path, NOW - timedelta(hours=2), [_ip("192.0.2.1")])
+    _report(tmp_path, NOW - timedelta(hours=1), [_ip("192.0.2.1")])
+    old.with_suffix(".ndjson").write_text("")
+    Compactor(tmp_path, export_grace=timedelta(0)).compact(NOW)
+    assert not old.with_suffix(".ndjson").exists()
+
+
+def test_stale_partials_and_anomaly_reports_are_swept(tmp_path):
+    stale = tmp_path / "intel_report_20260101T000000Z.json.partial"
+    fresh = tmp_path / "intel_report_20260110T115900Z.ndjson.partial"
+    for path, age in ((stale, timedelta(days=2)), (fresh, timedelta(minutes=1))):
+        path.write_text("{")
+        mtime = (NOW - age - datetime(1970, 1, 1)).total_seconds()
+        os.utime(path, (mtime, mtime))
+    old_anomalies = anomaly_report_path(tmp_path, "20250101T000000Z")
+    old_anomalies.parent.mkdir(parents=True)
+    old_anomalies.write_text("[]")
+
+    stats = Compactor(tmp_path).compact(NOW)
+    assert (stats["swept"], stats["anomaly_reports"]) == (1, 1)
+    assert not stale.exists() and fresh.exists()
+    assert not old_anomalies.exists()
+
+
+def test_folding_deltas_into_the_base_keeps_the_state(tmp_path):
+    compactor = Compactor(tmp_path, keep_snapshots=0, max_deltas=3, shards=1)
+    for i in range(6):
+        _report(tmp_path, NOW - timedelta(hours=6 - i), [_ip(f"192.0.2.{i}"), _ip("192.0.2.100", seen=i)])
+        compactor.compact(NOW)
+    state = compactor.load_state()
+    assert sorted(state) == sorted([f"192.0.2.{i}" for i in range(6)] + ["192.0.2.100"])
+    assert state["192.0.2.100"]["seen"] == 5
+    assert state["192.0.2.100"]["first_seen"] == (NOW - timedelta(hours=6)).isoformat() + "Z"
+    assert compactor.base_path(0).exists()
+    assert len(list(compactor.deltas_dir(0).glob("delta_*.json"))) <= 3
+
+
+def test_idle_shards_are_not_read(tmp_path):
+    compactor = Compactor(tmp_path, shards=16)
+    _report(tmp_path, NOW - timedelta(hours=2), [_ip("192.0.2.1")])
+    assert compactor.compact(NOW)["shards"] == 1
+    stats = compactor.compact(NOW + timedelta(hours=1))
+    assert (stats["shards"], stats["live"]) == (0, 1)
+    # Once the indicator is due to expire its shard is read again
+    stats = compactor.compact(NOW + timedelta(days=8))
+    assert (stats["shards"], stats["expired"], stats["live"]) == (1, 1, 0)
+
+
+def test_compaction_is_due_after_the_interval(tmp_path):
+    compactor = Compactor(tmp_path)
+    assert compactor.due(timedelta(hours=1), NOW)
+    compactor.compact(NOW)
+    assert not compactor.due(timedelta(hours=1), NOW + timedelta(minutes=30))
+    assert compactor.due(timedelta(hours=1), NOW + timedelta(hours=1))
+
+
+def _ingest_batches(reports_dir, prefix, batches):
+    Compactor(reports_dir).ingest(
+        [{"indicator": f"{prefix}-{b}-{i}", "type": "hash"} for i in range(20)] for b in range(batches)
+    )
+
+
+def test_ingest_from_another_process_is_never_lost(tmp_path):
+    # The importer CLI runs its own Compactor in another process
+    context = multiprocessing.get_context("fork")
+    importer = context.Process(target=_ingest_batches, args=(tmp_path, "imported", 40))
+    importer.start()
+    compactor = Compactor(tmp_path, keep_snapshots=0, max_deltas=1, shards=4)
+    while importer.is_alive():
+        compactor.compact()
+    importer.join()
+    assert importer.exitcode == 0
+    compactor.compact()
+    state = compactor.load_state()
+    assert sum(key.startswith("imported-") for key in state) == 40 * 20
+
+
+def test_concurrent_ingest_uses_distinct_sequence_numbers(tmp_path):
+    context = multiprocessing.get_context("fork")
+    workers = [context.Process(target=_ingest_batches, args=(tmp_path, f"w{n}", 20)) for n in range(3)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    assert len(Compactor(tmp_path).load_state()) == 3 * 20 * 20
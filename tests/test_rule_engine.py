@@ -0,0 +1,122 @@
+import ipaddress
+import json
+import os
+import random
+
+import pytest
+
+from ..analyzers.regulatory_analyzer import RegulatoryAnalyzer
+from ..analyzers.rule_engine import RuleError, compile_rules, severity_level
+
+TYPES = ["ip", "domain", "url"]
+SOURCES = ["misp", "otx", "shodan"]
+TAGS = ["phishing", "ransomware", "botnet", "apt"]
+SEVERITIES = ["low", "medium", "high", "critical"]
+
+
+def _random_rule(rng, i):
+    match = {}
+    if rng.random() < 0.5:
+        match["type"] = rng.sample(TYPES, rng.randint(1, 2))
+    if rng.random() < 0.5:
+        match["source"] = rng.choice(SOURCES)
+    if rng.random() < 0.6:
+        match["tags"] = rng.sample(TAGS, rng.randint(1, 2))
+    if rng.random() < 0.4:
+        match["asset_ranges"] = [f"10.{rng.randint(0, 3)}.0.0/{rng.choice((16, 24))}"]
+    if rng.random() < 0.5:
+        match["min_severity"] = rng.choice(SEVERITIES)
+    return {"id": f"rule-{i}", "regulation": "NIS2", "match": match}
+
+
+def _random_item(rng):
+    item = {
+        "indicator": f"10.{rng.randint(0, 3)}.0.{rng.randint(1, 254)}" if rng.random() < 0.7 else "example.org",
+        "type": rng.choice(TYPES),
+        "source": rng.choice(SOURCES),
+        "tags": rng.sample(TAGS, rng.randint(0, 2)),
+    }
+    if rng.random() < 0.5:
+        item["severity"] = rng.choice(SEVERITIES)
+    else:
+        item["confidence"] = rng.random()
+    return item
+
+
+def _brute_force(specs, item):
+    """Evaluate every rule directly, without the index."""
+    level = severity_level(item)
+    try:
+        address = ipaddress.ip_address(item["indicator"])
+    except ValueError:
+        address = None
+    matched = []
+    for spec in specs:
+        match = spec["match"]
+        types = match.get("type")
+        if types and item["type"] not in types:
+            continue
+        if "source" in match and item["source"] != match["source"]:
+            continue
+        if "tags" in match and not set(match["tags"]) & set(item["tags"]):
+            continue
+        if "asset_ranges" in match and (
+            address is None or not any(address in ipaddress.ip_network(r) for r in match["asset_ranges"])
+        ):
+            continue
+        if "min_severity" in match and (level is None or level < compile_rules([spec]).rules[0].min_severity):
+            continue
+        matched.append(spec["id"])
+    return matched
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_index_matches_brute_force(seed):
+    rng = random.Random(seed)
+    specs = [_random_rule(rng, i) for i in range(300)]
+    index = compile_rules(specs)
+    for _ in range(500):
+        item = _random_item(rng)
+        assert [rule.id for rule in index.match(item)] == _brute_force(specs, item)
+
+
+def test_rules_sharing_a_tag_are_split_by_network_and_severity():
+    specs = [
+        {"id": f"net-{i}", "match": {"tags": ["phishing"], "asset_ranges": [f"10.0.{i}.0/24"]}} for i in range(100)
+    ] + [{"id": "sev", "match": {"tags": ["phishing"], "min_severity": "critical"}}]
+    index = compile_rules(specs)
+    bucket = index._buckets[("*", "*")].by_tag["phishing"]
+    item = {"indicator": "10.0.7.1", "type": "ip", "tags": ["phishing"], "severity": "low"}
+    assert [rule.id for rule in bucket.candidates({"phishing"}, ipaddress.ip_address("10.0.7.1"), 1)] == ["net-7"]
+    assert [rule.id for rule in index.match(item)] == ["net-7"]
+
+
+def test_invalid_rules_are_rejected():
+    with pytest.raises(RuleError):
+        compile_rules([{"id": "a", "match": {}}, {"id": "a", "match": {}}])
+    with pytest.raises(RuleError):
+        compile_rules([{"id": "a", "match": {"min_severity": "urgent"}}])
+    with pytest.raises(RuleError):
+        compile_rules([{"id": "a", "match": {"asset_ranges": ["not-a-network"]}}])
+
+
+def _write_rules(path, specs, mtime):
+    path.write_text(json.dumps({"rules": specs}))
+    os.utime(path, ns=(mtime, mtime))
+
+
+def test_rules_are_hot_reloaded(tmp_path):
+    path = tmp_path / "rules.json"
+    _write_rules(path, [{"id": "gdpr", "regulation": "GDPR", "match": {"type": "email"}}], 1_000_000_000)
+    analyzer = RegulatoryAnalyzer(rules_path=path)
+    item = {"indicator": "a@example.org", "type": "email"}
+    assert [c["id"] for c in next(iter(analyzer.analyze([item])))["compliance"]] == ["gdpr"]
+
+    _write_rules(path, [{"id": "nis2", "regulation": "NIS2", "match": {"type": "email"}}], 2_000_000_000)
+    assert [c["id"] for c in next(iter(analyzer.analyze([item])))["compliance"]] == ["nis2"]
+
+    # A broken edit keeps the last good rule set
+    path.write_text("{not json")
+    os.utime(path, ns=(3_000_000_000, 3_000_000_000))
+    assert not analyzer.reload_if_changed()
+    assert [c["id"] for c in next(iter(analyzer.analyze([item])))["compliance"]] == ["nis2"]
@@ -0,0 +1,43 @@
+import json
+
+import pytest
+
+from ..runner import run_collection
+from ..sources.base_source import BaseSource
+
+
+class _Feed(BaseSource):
+    name = "feed"
+
+    def __init__(self, count):
+        self.count = count
+        self.committed = False
+
+    def fetch(self):
+        return [{"indicator": f"192.0.2.{i}", "type": "ip", "source": self.name} for i in range(self.count)]
+
+    def commit(self):
+        self.committed = True
+
+
+def _files(reports_dir):
+    return sorted(p.name for p in reports_dir.iterdir() if p.is_file())
+
+
+def test_run_publishes_the_report_and_its_export(tmp_path):
+    feed = _Feed(20)
+    path = run_collection(tmp_path, sources=[feed], sinks=[])
+    assert _files(tmp_path) == sorted([path.name, path.stem + ".ndjson", path.stem + ".idx"])
+    assert len(json.loads(path.read_text())["items"]) == 20
+    assert feed.committed
+
+
+def test_failed_run_leaves_no_partial_files_and_keeps_the_cursor(tmp_path):
+    def broken_sink(batch):
+        raise RuntimeError("sink down")
+
+    feed = _Feed(20)
+    with pytest.raises(RuntimeError):
+        run_collection(tmp_path, sources=[feed], sinks=[broken_sink])
+    assert _files(tmp_path) == []
+    assert not feed.committed
@@ -0,0 +1,85 @@
+import io
+import json
+import threading
+
+import pytest
+
+from ..benchmarks.taxii_stub_server import make_server, write_bundle
+from ..sources import stix_source
+from ..sources.stix_source import StixSource, _iter_array_fallback
+
+
+def _bundle(objects, trailer=None):
+    doc = {"type": "bundle", "objects": objects}
+    doc.update(trailer or {})
+    return json.dumps(doc, ensure_ascii=False).encode("utf-8")
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 64, 1 << 20])
+def test_fallback_survives_chunk_boundaries(monkeypatch, chunk_size):
+    monkeypatch.setattr(stix_source, "_CHUNK_SIZE", chunk_size)
+    objects = [
+        {"type": "indicator", "id": f"indicator--{i}", "pattern": f"[domain-name:value = 'ex{i}.dk']",
+         "name": "æøå – ünïcødé ✓", "labels": ["a", "b"], "nested": {"list": [1, 2, {"x": "]"}]}}
+        for i in range(20)
+    ]
+    envelope = {}
+    data = _bundle(objects, {"more": True, "next": "abc"})
+    assert list(_iter_array_fallback(io.BytesIO(data), "objects", envelope)) == objects
+    assert envelope["more"] is True
+    assert envelope["next"] == "abc"
+
+
+def test_fallback_reads_envelope_before_the_array(monkeypatch):
+    monkeypatch.setattr(stix_source, "_CHUNK_SIZE", 5)
+    data = b'{"more": false, "objects": [ {"a": 1} , {"b": 2} ]}'
+    envelope = {}
+    assert list(_iter_array_fallback(io.BytesIO(data), "objects", envelope)) == [{"a": 1}, {"b": 2}]
+    assert envelope == {"more": False}
+
+
+def test_fallback_handles_missing_and_empty_arrays():
+    assert list(_iter_array_fallback(io.BytesIO(b'{"type": "bundle"}'), "objects", None)) == []
+    assert list(_iter_array_fallback(io.BytesIO(b'{"objects": []}'), "objects", None)) == []
+
+
+def test_fallback_rejects_truncated_bundles(monkeypatch):
+    monkeypatch.setattr(stix_source, "_CHUNK_SIZE", 4)
+    with pytest.raises(ValueError):
+        list(_iter_array_fallback(io.BytesIO(b'{"objects": [{"a": 1}, {"b": '), "objects", None))
+
+
+def test_bundle_files_are_mapped_to_indicators(tmp_path):
+    path = write_bundle(tmp_path / "bundle.json", 50)
+    items = list(StixSource(paths=[str(path)]).fetch())
+    assert len(items) == 50
+    assert {item["source"] for item in items} == {"stix"}
+    assert all(item["indicator"] and item["type"] for item in items)
+
+
+@pytest.fixture
+def taxii_url():
+    server = make_server(port=0, total_objects=25)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/api1/collections/test/objects/"
+    server.shutdown()
+    server.server_close()
+
+
+def test_taxii_cursor_only_advances_on_commit(tmp_path, taxii_url):
+    cursor = tmp_path / "cursor"
+    source = StixSource(paths=[], taxii_url=taxii_url, cursor_file=str(cursor), page_size=10)
+    assert len(list(source.fetch())) == 25
+    assert not cursor.exists()
+    assert source.pending_cursor is not None
+
+    # An uncommitted run is fetched again in full
+    retry = StixSource(paths=[], taxii_url=taxii_url, cursor_file=str(cursor), page_size=10)
+    assert len(list(retry.fetch())) == 25
+    retry.commit()
+    assert retry.pending_cursor is None
+    assert cursor.read_text() == "2024-01-01T00:00:24.000Z"
+
+    resumed = StixSource(paths=[], taxii_url=taxii_url, cursor_file=str(cursor), page_size=10)
+    assert list(resumed.fetch()) == []
@@ -0,0 +1,86 @@
+import json
+import os
+import random
+
+from ..briefing.executive_briefing import ExecutiveBriefing
+from ..briefing.summary import IndicatorSummary
+
+
+def _items(n=200):
+    rng = random.Random(7)
+    return [
+        {
+            "indicator": f"10.0.{i // 250}.{i % 250}",
+            "type": rng.choice(["ip", "domain"]),
+            "source": rng.choice(["misp", "otx"]),
+            "confidence": rng.choice([0.5, 0.7, 0.9, "high"]),
+            "tags": rng.sample(["phishing", "botnet", "apt"], rng.randint(0, 2)),
+            "compliance": [{"regulation": "NIS2"}] if i % 3 == 0 else [],
+        }
+        for i in range(n)
+    ]
+
+
+def test_summary_is_independent_of_input_order():
+    items = _items()
+    shuffled = list(items)
+    random.Random(1).shuffle(shuffled)
+    a = IndicatorSummary(top_n=5).update(items)
+    b = IndicatorSummary(top_n=5).update(shuffled)
+    assert a.fingerprint == b.fingerprint
+    assert a.top() == b.top()
+    assert a.by_compliance["NIS2"] == 67
+    assert len(a.top()) == 5
+
+
+def test_fingerprint_changes_with_rendered_fields():
+    items = _items()
+    changed = [dict(item) for item in items]
+    changed[10]["confidence"] = 0.01
+    assert IndicatorSummary().update(items).fingerprint != IndicatorSummary().update(changed).fingerprint
+
+
+def test_campaigns_resolve_through_the_report_mapping():
+    items = [
+        {"indicator": "a", "type": "ip", "campaign_id": "c-1", "campaign_size": 1},
+        {"indicator": "b", "type": "ip", "campaign_id": "c-2", "campaign_size": 2},
+        {"indicator": "c", "type": "ip", "campaign_id": "c-3", "campaign_size": 1},
+    ]
+    summary = IndicatorSummary(campaigns={
+        "c-1": {"campaign_id": "c-2", "campaign_size": 3},
+        "c-2": {"campaign_id": "c-2", "campaign_size": 3},
+    }).update(items)
+    assert list(summary.campaigns) == ["c-2"]
+    stats = summary.campaigns["c-2"]
+    assert (stats.observed, stats.size, stats.example) == (2, 3, "a")
+
+
+class _CountingList(list):
+    iterations = 0
+
+    def __iter__(self):
+        type(self).iterations += 1
+        return super().__iter__()
+
+
+def test_briefing_cache_skips_rendering_and_scanning():
+    briefing = ExecutiveBriefing(top_n=3)
+    data = _CountingList(_items())
+    first = briefing.generate(data, key="run-1")
+    assert briefing.generate(list(reversed(data))) == first
+    before = _CountingList.iterations
+    assert briefing.generate(data, key="run-1") == first
+    assert _CountingList.iterations == before
+
+
+def test_generate_report_reads_the_file_once(tmp_path):
+    path = tmp_path / "intel_report_x.json"
+    path.write_text(json.dumps({"items": _items(20), "campaigns": {}}))
+    stat = path.stat()
+    briefing = ExecutiveBriefing()
+    text = briefing.generate_report(path)
+    assert "Indicators observed: 20" in text
+    # Unparseable bytes behind the same size and mtime are never read
+    path.write_text("x" * stat.st_size)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert briefing.generate_report(path) == text